@@ -431,6 +431,24 @@ async def handle_submit_answers(session: AnsweringSession, data: dict):
         await session.send_error(str(e))
 
 
+def _parse_flag(value: Any) -> bool:
+    """解析 extra_params 中的开关（JSON 中可能存成 "false"/"0" 等字符串）"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _parse_positive_int(value: Any) -> Optional[int]:
+    """解析 extra_params 中的正整数，无效或不大于0时返回None"""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
 async def get_active_llm_service(db: AsyncSession) -> Optional[LLMService]:
     """获取激活的LLM服务"""
     result = await db.execute(
@@ -454,12 +472,16 @@ async def get_active_llm_service(db: AsyncSession) -> Optional[LLMService]:
         log.error(f"LLM配置 {config.name} API密钥为空或处理失败")
         return None
 
+    extra_params = config.extra_params or {}
     return LLMService(
         api_key=decrypted_api_key,
         base_url=config.base_url,
         model=config.model,
         temperature=config.temperature,
         max_tokens=config.max_tokens,
+        # 供应商支持 response_format=json_object 时可在 extra_params 中开启
+        json_mode=_parse_flag(extra_params.get("json_mode", False)),
+        max_input_tokens=_parse_positive_int(extra_params.get("max_input_tokens")),
     )
 
 
@@ -40,6 +40,13 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     log_retention_days: int = 30
     
+    # 浏览器池配置（环境变量 WJX_POOL_MIN / WJX_POOL_MAX / WJX_POOL_IDLE_MS 等）
+    wjx_pool_min: int = 1
+    wjx_pool_max: int = 4
+    wjx_pool_idle_ms: int = 300000
+    wjx_pool_contexts_per_browser: int = 8
+    wjx_browser_cdp_url: Optional[str] = None  # 外部常驻Chromium的CDP地址，如 http://127.0.0.1:9222
+    
     # 路径配置
     @property
     def project_root(self) -> Path:
@@ -9,6 +9,7 @@ from backend.core.config import settings
 from backend.core.logger import log
 from backend.core.database import init_db, close_db
 from backend.migrations.manager import migration_manager
+from backend.services.platforms import close_platforms
 from backend.api import questionnaire, llm, knowledge, settings as settings_api, websocket, history
 
 
@@ -34,6 +35,7 @@ async def lifespan(app: FastAPI):
     finally:
         # 关闭时执行
         log.info("ExamPilot 关闭中...")
+        await close_platforms()
         await close_db()
         log.info("ExamPilot 已关闭")
 
@@ -1,7 +1,7 @@
 """答题模式管理"""
 from enum import Enum
 from typing import List, Dict, Any, Optional, Callable
-from backend.models.question import Question
+from backend.models.question import Question, QuestionType
 from backend.models.answer import Answer, AnswerStatus
 from backend.core.logger import log
 from backend.services.llm_service import LLMService
@@ -9,6 +9,16 @@ from backend.services.knowledge_base import KnowledgeBaseService
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+# 需要手动输入答案的题型（答题等待中计入打字时间）
+_TYPED_QUESTION_TYPES = frozenset({
+    QuestionType.FILL_BLANK,
+    QuestionType.GAP_FILL,
+    QuestionType.MATRIX_FILL,
+    QuestionType.ESSAY,
+    QuestionType.MULTIPLE_ESSAY,
+})
+
+
 class AnsweringMode(str, Enum):
     """答题模式"""
     FULL_AUTO = "FULL_AUTO"
@@ -106,9 +116,18 @@ class ModeHandler:
                 log.info(f"置信度: {answer.confidence:.2%}")
                 log.info(f"推理: {answer.reasoning[:80]}{'...' if len(answer.reasoning) > 80 else ''}")
                 
-                # 模拟人类答题时间
+                # 模拟人类答题时间：答题间隔、阅读题目、输入答案合并为一次等待
                 if timing_simulator:
-                    await timing_simulator.wait_before_answer(idx, len(questions))
+                    typed_text = ""
+                    if question.type in _TYPED_QUESTION_TYPES and answer.content:
+                        content = answer.content
+                        typed_text = "".join(map(str, content)) if isinstance(content, list) else str(content)
+                    await timing_simulator.wait_full(
+                        idx,
+                        len(questions),
+                        content_length=len(question.content),
+                        text=typed_text,
+                    )
                 
                 # 检查置信度
                 if answer.needs_confirmation(confidence_threshold):
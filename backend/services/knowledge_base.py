@@ -7,7 +7,7 @@ from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.schema import KnowledgeDocument, KnowledgeChunk, VectorEmbedding
 from backend.core.logger import log
-from backend.services.llm_service import EmbeddingService, RerankService
+from backend.services.llm_service import EmbeddingService, RerankService, cosine_similarities
 
 
 class KnowledgeBaseService:
@@ -227,8 +227,6 @@ class KnowledgeBaseService:
         Returns:
             分块列表
         """
-        import re
-        
         if not text.strip():
             return []
         
@@ -390,21 +388,9 @@ class KnowledgeBaseService:
         Returns:
             分块列表
         """
-        chunks = []
-        start = 0
-        text_length = len(text)
-        
-        while start < text_length:
-            end = min(start + chunk_size, text_length)
-            chunk = text[start:end]
-            chunks.append(chunk)
-            
-            # 计算下一个起始位置
-            start += chunk_size - overlap
-            
-            # 防止无限循环
-            if start <= end - chunk_size and overlap >= chunk_size:
-                start = end
+        # 相邻分块起点间隔（重叠不小于分块大小时退化为不重叠，防止无限循环）
+        step = chunk_size - overlap if overlap < chunk_size else chunk_size
+        chunks = (text[start:start + chunk_size] for start in range(0, len(text), step))
         
         return [c.strip() for c in chunks if c.strip()]
     
@@ -440,10 +426,10 @@ class KnowledgeBaseService:
         # 批量生成向量
         try:
             log.info(f"调用Embedding服务批量生成向量...")
-            embeddings = await self.embedding_service.embed_batch(texts)
+            embeddings = await self.embedding_service.embed_batch_np(texts)
 
             # 验证返回的embeddings
-            if not embeddings:
+            if embeddings.size == 0:
                 raise ValueError("Embedding服务返回空结果")
 
             if len(embeddings) != len(chunks):
@@ -473,19 +459,18 @@ class KnowledgeBaseService:
             for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
                 try:
                     # 验证embedding
-                    if not embedding or not isinstance(embedding, list):
+                    if embedding.size == 0:
                         log.warning(f"第{idx+1}个embedding格式无效，跳过")
                         continue
 
-                    # 转换为numpy数组并序列化
-                    vector_array = np.array(embedding, dtype=np.float32)
-                    vector_bytes = vector_array.tobytes()
+                    # embed_batch_np 已返回float32矩阵，直接序列化
+                    vector_bytes = embedding.tobytes()
 
                     vector_embedding = VectorEmbedding(
                         chunk_id=chunk.id,
                         embedding=vector_bytes,
                         model_name=self.embedding_service.model,
-                        dimension=len(embedding),
+                        dimension=embedding.shape[0],
                     )
                     session.add(vector_embedding)
                     saved_count += 1
@@ -541,8 +526,7 @@ class KnowledgeBaseService:
             搜索结果列表
         """
         # 生成查询向量
-        query_embedding = await self.embedding_service.embed_text(query)
-        query_vector = np.array(query_embedding, dtype=np.float32)
+        query_vector = await self.embedding_service.embed_text(query)
         
         # 构建查询
         query_stmt = (
@@ -564,20 +548,20 @@ class KnowledgeBaseService:
         if not all_records:
             return []
         
-        # 计算相似度
+        # 反序列化所有向量为一个矩阵，一次矩阵乘法计算全部余弦相似度
+        stored_matrix = np.vstack([
+            np.frombuffer(embedding_record.embedding, dtype=np.float32)
+            for embedding_record, _, _ in all_records
+        ])
+        scores = cosine_similarities(query_vector, stored_matrix)
+        
         similarities = []
-        for embedding_record, chunk, document in all_records:
-            # 反序列化向量
-            stored_vector = np.frombuffer(embedding_record.embedding, dtype=np.float32)
-            
-            # 计算余弦相似度
-            similarity = self._cosine_similarity(query_vector, stored_vector)
-            
+        for (_, chunk, document), similarity in zip(all_records, scores.tolist()):
             if similarity >= score_threshold:
                 similarities.append({
                     "chunk": chunk,
                     "document": document,
-                    "similarity": float(similarity),
+                    "similarity": similarity,
                 })
         
         # 排序
@@ -604,17 +588,6 @@ class KnowledgeBaseService:
             for result in top_results
         ]
     
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """计算余弦相似度"""
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        return dot_product / (norm1 * norm2)
-    
     async def _rerank_results(
         self,
         query: str,
@@ -1,14 +1,44 @@
 """LLM服务模块"""
+import asyncio
+import functools
 import json
 from typing import Optional, Dict, Any, List
 import httpx
+import numpy as np
 from backend.models.question import Question, QuestionType
 from backend.models.answer import Answer, AnswerStatus
 from backend.core.logger import log
 
 
+# JSON模式下追加到系统提示词的说明（OpenAI 要求消息中出现"json"字样，否则拒绝请求）
+_JSON_MODE_HINT = "\n请只输出一个有效的JSON对象。"
+
+
+def cosine_similarities(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    批量计算余弦相似度（知识库检索使用）
+    
+    Args:
+        query: 查询向量，shape为(dim,)
+        matrix: 候选向量矩阵，shape为(n, dim)
+        
+    Returns:
+        float32相似度数组，shape为(n,)；零向量的相似度为0
+    """
+    query = np.asarray(query, dtype=np.float32)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    dots = matrix @ query
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
+
+
 class LLMService:
     """LLM服务类"""
+
+    __slots__ = (
+        "api_key", "base_url", "model", "temperature", "max_tokens", "json_mode",
+        "max_input_tokens", "_encoding", "client",
+    )
     
     def __init__(
         self,
@@ -17,12 +47,20 @@ class LLMService:
         model: str = "deepseek-chat",
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        max_input_tokens: Optional[int] = None,
     ):
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        # 请求供应商以 JSON 模式输出（response_format=json_object）；
+        # 并非所有OpenAI兼容供应商都支持该参数，默认关闭，由LLM配置的 extra_params 开启
+        self.json_mode = json_mode
+        # 输入令牌上限（None表示不在本地校验）
+        self.max_input_tokens = max_input_tokens
+        self._encoding = None  # 延迟加载的tiktoken编码器，False表示不可用
         self.client = httpx.AsyncClient(timeout=60.0)
     
     async def answer_question(
@@ -43,6 +81,9 @@ class LLMService:
             答案对象
         """
         try:
+            if self.max_input_tokens:
+                await self._ensure_encoding()
+            
             # 构建提示词
             messages = self._build_messages(question, knowledge_context, system_prompt)
             
@@ -150,6 +191,8 @@ class LLMService:
         # 系统提示词
         if not system_prompt:
             system_prompt = self._get_default_system_prompt(question.type)
+        if self.json_mode and "json" not in system_prompt.lower():
+            system_prompt += _JSON_MODE_HINT
         
         messages.append({
             "role": "system",
@@ -158,6 +201,11 @@ class LLMService:
         
         # 用户消息
         user_content = self._build_user_prompt(question, knowledge_context)
+        if self.max_input_tokens and knowledge_context:
+            budget = self.max_input_tokens - self._count_tokens(system_prompt)
+            if self._count_tokens(user_content) > budget:
+                knowledge_context = self._truncate_context(question, knowledge_context, budget)
+                user_content = self._build_user_prompt(question, knowledge_context)
         messages.append({
             "role": "user",
             "content": user_content,
@@ -165,8 +213,10 @@ class LLMService:
         
         return messages
     
-    def _get_default_system_prompt(self, question_type: QuestionType) -> str:
-        """获取默认系统提示词"""
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_default_system_prompt(question_type: QuestionType) -> str:
+        """获取默认系统提示词（每种题型只构建一次）"""
         base_prompt = """你是一个专业的答题助手。请根据题目内容和提供的信息，给出准确答案。
 
 【重要规则】
@@ -209,10 +259,65 @@ class LLMService:
         
         return "\n".join(prompt_parts)
     
+    async def _ensure_encoding(self):
+        """在线程中加载tiktoken编码器（首次加载会读取或下载BPE文件，不能阻塞事件循环）"""
+        if self._encoding is None:
+            self._encoding = await asyncio.to_thread(self._load_encoding)
+
+    @staticmethod
+    def _load_encoding():
+        """加载tiktoken编码器，不可用时返回False"""
+        try:
+            import tiktoken
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            log.debug(f"tiktoken不可用，使用字符数估算令牌: {e}")
+            return False
+
+    def _get_encoding(self):
+        """返回已加载的tiktoken编码器，未加载或不可用时返回None"""
+        return self._encoding or None
+
+    def _count_tokens(self, text: str) -> int:
+        """统计文本令牌数（无tiktoken时按字符保守估算）"""
+        encoding = self._get_encoding()
+        if encoding is not None:
+            # 参考资料可能含 <|endoftext|> 等特殊令牌文本，按普通文本计数
+            return len(encoding.encode(text, disallowed_special=()))
+        # 中文等非ASCII字符约1字1令牌，ASCII约4字符1令牌
+        ascii_count = sum(1 for c in text if c.isascii())
+        return (len(text) - ascii_count) + (ascii_count + 3) // 4
+
+    def _truncate_context(self, question: Question, knowledge_context: str, budget: int) -> str:
+        """截断参考资料，使用户提示词不超过令牌预算"""
+        # 二分查找能放下的最长前缀
+        low, high = 0, len(knowledge_context)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self._count_tokens(self._build_user_prompt(question, knowledge_context[:mid])) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+
+        truncated = knowledge_context[:low]
+        # 尽量在段落或词语边界处截断
+        boundary = max(truncated.rfind("\n"), truncated.rfind(" "))
+        if boundary > low // 2:
+            truncated = truncated[:boundary]
+
+        log.warning(f"参考资料超出令牌预算，已截断: {len(knowledge_context)} -> {len(truncated)} 字符")
+        return truncated.rstrip()
+
     async def _call_api(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
         """调用OpenAI兼容的API"""
         url = f"{self.base_url}/chat/completions"
 
+        # 本地校验输入长度，避免发送注定被拒绝的请求
+        if self.max_input_tokens:
+            input_tokens = sum(self._count_tokens(m["content"]) for m in messages)
+            if input_tokens > self.max_input_tokens:
+                raise ValueError(f"输入令牌数 {input_tokens} 超过上限 {self.max_input_tokens}")
+
         payload = {
             "model": self.model,
             "messages": messages,
@@ -222,6 +327,9 @@ class LLMService:
         if self.max_tokens:
             payload["max_tokens"] = self.max_tokens
 
+        if self.json_mode:
+            payload["response_format"] = {"type": "json_object"}
+
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -303,8 +411,16 @@ class LLMService:
             if not content or not isinstance(content, str):
                 raise ValueError(f"响应内容无效: {content}")
 
-            # 尝试从内容中提取JSON（使用更健壮的方法）
-            result = self._extract_json_from_text(content)
+            # JSON模式下输出本身就是JSON，直接解析；
+            # 供应商忽略该参数时再用更健壮的方法从文本中提取
+            result = None
+            if self.json_mode:
+                try:
+                    result = json.loads(content)
+                except json.JSONDecodeError:
+                    pass
+            if not isinstance(result, dict) or "answer" not in result:
+                result = self._extract_json_from_text(content)
 
             if result and isinstance(result, dict) and "answer" in result:
                 # 成功提取JSON格式
@@ -387,6 +503,8 @@ class LLMService:
 
 class EmbeddingService:
     """Embedding服务类"""
+
+    __slots__ = ("api_key", "base_url", "model", "client")
     
     def __init__(
         self,
@@ -399,7 +517,7 @@ class EmbeddingService:
         self.model = model
         self.client = httpx.AsyncClient(timeout=60.0)
     
-    async def embed_text(self, text: str) -> List[float]:
+    async def embed_text(self, text: str) -> np.ndarray:
         """
         对文本进行embedding
         
@@ -407,7 +525,7 @@ class EmbeddingService:
             text: 输入文本
             
         Returns:
-            向量列表
+            float32向量，shape为(dim,)
         """
         url = f"{self.base_url}/embeddings"
         
@@ -439,8 +557,9 @@ class EmbeddingService:
             if not embedding or not isinstance(embedding, list):
                 raise ValueError(f"无效的embedding数据: {embedding}")
 
-            log.debug(f"← Embedding成功，维度: {len(embedding)}")
-            return embedding
+            vector = np.asarray(embedding, dtype=np.float32)
+            log.debug(f"← Embedding成功，维度: {vector.shape[0]}")
+            return vector
 
         except httpx.TimeoutException as e:
             log.error(f"❌ Embedding API调用超时: {url}")
@@ -466,7 +585,7 @@ class EmbeddingService:
     
     async def embed_batch(self, texts: List[str], batch_size: int = 10) -> List[List[float]]:
         """
-        批量embedding，自动分批处理
+        批量embedding，返回Python列表（兼容旧调用方）
         
         Args:
             texts: 文本列表
@@ -475,26 +594,39 @@ class EmbeddingService:
         Returns:
             向量列表
         """
+        return (await self.embed_batch_np(texts, batch_size)).tolist()
+    
+    async def embed_batch_np(self, texts: List[str], batch_size: int = 10) -> np.ndarray:
+        """
+        批量embedding，自动分批处理
+        
+        Args:
+            texts: 文本列表
+            batch_size: 每批最多处理的文本数量（阿里云限制为10）
+            
+        Returns:
+            float32矩阵，shape为(len(texts), dim)
+        """
         if not texts:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
         
         # 如果文本数量超过batch_size，分批处理
         if len(texts) > batch_size:
             log.info(f"→ 文本数量 {len(texts)} 超过批次限制 {batch_size}，将分批处理")
-            all_embeddings = []
+            batches = []
             
             for i in range(0, len(texts), batch_size):
                 batch = texts[i:i + batch_size]
                 log.info(f"  处理第 {i//batch_size + 1} 批，共 {len(batch)} 个文本 ({i+1}-{i+len(batch)}/{len(texts)})")
-                batch_embeddings = await self._embed_single_batch(batch)
-                all_embeddings.extend(batch_embeddings)
+                batches.append(await self._embed_single_batch(batch))
             
+            all_embeddings = np.vstack(batches)
             log.info(f"← 批量Embedding完成，共生成 {len(all_embeddings)} 个向量")
             return all_embeddings
         else:
             return await self._embed_single_batch(texts)
     
-    async def _embed_single_batch(self, texts: List[str]) -> List[List[float]]:
+    async def _embed_single_batch(self, texts: List[str]) -> np.ndarray:
         """
         处理单个批次的embedding
         
@@ -502,7 +634,7 @@ class EmbeddingService:
             texts: 文本列表（不超过10个）
             
         Returns:
-            向量列表
+            float32矩阵，shape为(len(texts), dim)
         """
         url = f"{self.base_url}/embeddings"
         
@@ -530,15 +662,18 @@ class EmbeddingService:
             if not result["data"]:
                 raise ValueError("批量Embedding返回空数据")
 
-            # 提取embeddings
-            embeddings = []
+            # 校验后一次性打包为float32矩阵
             for i, item in enumerate(result["data"]):
                 if not isinstance(item, dict) or "embedding" not in item:
                     raise ValueError(f"第{i+1}个embedding数据格式无效")
-                embedding = item["embedding"]
-                if not isinstance(embedding, list):
+                if not isinstance(item["embedding"], list):
                     raise ValueError(f"第{i+1}个embedding不是列表类型")
-                embeddings.append(embedding)
+
+            embeddings = np.asarray(
+                [item["embedding"] for item in result["data"]], dtype=np.float32
+            )
+            if embeddings.ndim != 2:
+                raise ValueError(f"批量Embedding维度不一致: shape={embeddings.shape}")
 
             log.debug(f"← 批量Embedding成功，生成 {len(embeddings)} 个向量")
             return embeddings
@@ -566,6 +701,8 @@ class EmbeddingService:
 
 class RerankService:
     """Rerank服务类"""
+
+    __slots__ = ("api_key", "base_url", "model", "client")
     
     def __init__(
         self,
@@ -621,27 +758,35 @@ class RerankService:
             # 验证响应格式
             if not isinstance(result, dict) or "results" not in result:
                 log.warning(f"Rerank响应格式无效，返回原始顺序")
-                return self._fallback_rerank(documents)
+                return self._fallback_rerank(documents, top_k)
 
             return result.get("results", [])
 
         except httpx.TimeoutException as e:
             log.warning(f"Rerank超时，返回原始顺序: {e}")
-            return self._fallback_rerank(documents)
+            return self._fallback_rerank(documents, top_k)
 
         except httpx.HTTPStatusError as e:
             log.warning(f"Rerank API错误 ({e.response.status_code})，返回原始顺序")
-            return self._fallback_rerank(documents)
+            return self._fallback_rerank(documents, top_k)
 
         except Exception as e:
             log.warning(f"Rerank调用失败，返回原始顺序: {type(e).__name__}: {e}")
-            return self._fallback_rerank(documents)
+            return self._fallback_rerank(documents, top_k)
+
+    def _fallback_rerank(
+        self,
+        documents: List[str],
+        top_k: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rerank失败时的降级处理
 
-    def _fallback_rerank(self, documents: List[str]) -> List[Dict[str, Any]]:
-        """Rerank失败时的降级处理"""
+        调用方传入的文档已按向量相似度排好序，保留原始顺序即可，不再重新调用embedding接口
+        """
         return [
             {"index": i, "score": 1.0, "document": doc}
-            for i, doc in enumerate(documents)
+            for i, doc in enumerate(documents[:top_k])
         ]
     
     async def close(self):
@@ -1,25 +1,57 @@
 """平台适配器模块"""
+from typing import Optional
+from urllib.parse import urlparse
 from backend.services.platforms.base import BasePlatform, PlatformType
+from backend.services.platforms.browser_pool import browser_pool
 from backend.services.platforms.wenjuanxing import WenjuanxingPlatform
 
-__all__ = ["BasePlatform", "PlatformType", "WenjuanxingPlatform"]
+__all__ = ["BasePlatform", "PlatformType", "WenjuanxingPlatform", "close_platforms"]
 
 
-# 平台注册表
+# 平台注册表（每个平台共享一个实例；适配器无请求级状态，但其按问卷URL的缓存
+# 跨会话共享，失效规则见各适配器的类文档）
 PLATFORM_REGISTRY = {
-    PlatformType.WENJUANXING: WenjuanxingPlatform,
+    PlatformType.WENJUANXING: WenjuanxingPlatform(),
 }
 
+# 域名 -> 平台类型（子域名按后缀匹配，如 www.wjx.cn / ks.wjx.top）
+PLATFORM_HOSTS = {
+    # 问卷星的多个域名
+    "wjx.cn": PlatformType.WENJUANXING,
+    "wjx.com": PlatformType.WENJUANXING,
+    "wjx.top": PlatformType.WENJUANXING,
+    "wenjuan.com": PlatformType.WENJUANXING,
+    "sojump.com": PlatformType.WENJUANXING,
+    "wenjuan.in": PlatformType.WENJUANXING,
+}
+
+
+def _match_platform_type(hostname: str) -> Optional[PlatformType]:
+    """按域名后缀逐级查找平台类型"""
+    labels = hostname.lower().rstrip(".").split(".")
+    for i in range(len(labels) - 1):
+        platform_type = PLATFORM_HOSTS.get(".".join(labels[i:]))
+        if platform_type is not None:
+            return platform_type
+    return None
+
 
 def get_platform(url: str) -> BasePlatform:
     """根据URL获取平台适配器"""
     # 清理URL：移除锚点和查询参数中的无关内容
     clean_url = url.split('#')[0].strip()
 
-    # 问卷星的多个域名
-    wjx_domains = ["wjx.cn", "wjx.com", "wjx.top", "wenjuan.com", "sojump.com", "wenjuan.in"]
-    if any(domain in clean_url for domain in wjx_domains):
-        return WenjuanxingPlatform()
+    # 只比较主机名，避免查询参数中出现的域名被误判
+    hostname = urlparse(clean_url if "://" in clean_url else f"//{clean_url}").hostname or ""
+    platform_type = _match_platform_type(hostname)
+    if platform_type is not None:
+        return PLATFORM_REGISTRY[platform_type]
 
     raise ValueError(f"不支持的问卷平台: {clean_url}")
 
+
+async def close_platforms():
+    """关闭所有平台适配器持有的资源及共享浏览器池"""
+    for platform in PLATFORM_REGISTRY.values():
+        await platform.close()
+    await browser_pool.close()
@@ -14,7 +14,14 @@ class PlatformType(str, Enum):
 
 
 class BasePlatform(ABC):
-    """平台适配器基类"""
+    """
+    平台适配器基类
+
+    每个平台全局共享一个实例，所有会话并发调用同一实例：适配器不能保存请求级状态，
+    实例上的缓存（如按问卷URL缓存的题型信息）跨会话共享，子类需说明其失效/淘汰规则。
+    """
+
+    __slots__ = ()
     
     @property
     @abstractmethod
@@ -99,3 +106,6 @@ class BasePlatform(ABC):
         """
         return bool(url and url.startswith(("http://", "https://")))
 
+    async def close(self):
+        """释放平台适配器持有的资源（应用关闭时调用）"""
+        pass
@@ -0,0 +1,236 @@
+"""浏览器池 - 复用已启动的浏览器，避免每次请求冷启动 Playwright"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+from backend.core.config import settings
+from backend.core.logger import log
+
+
+# Chromium 回退启动参数
+CHROMIUM_ARGS = [
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+]
+
+# 池键：(headless, slow_mo)
+PoolKey = Tuple[bool, Optional[float]]
+
+
+class _PooledBrowser:
+    """池中的浏览器及其使用情况"""
+
+    __slots__ = ("browser", "active", "last_used")
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.active = 0  # 当前打开的上下文数
+        self.last_used = time.monotonic()
+
+
+class BrowserPool:
+    """
+    浏览器池
+
+    按 (headless, slow_mo) 分组缓存已启动的浏览器。每次 acquire 在浏览器上
+    新建一个 BrowserContext 以隔离 Cookie/存储，用完只关闭上下文。
+    同一浏览器最多同时承载 contexts_per_browser 个上下文，并发请求共享
+    浏览器进程（网络栈、渲染进程等），满载后才启动新浏览器，每组最多 max_size 个。
+    后台任务定时回收空闲超过 idle_ms 的浏览器，每组至少保留 min_size 个。
+
+    可视化模式的有头浏览器不入池，每次调用单独启动、结束即关闭，避免窗口常驻。
+
+    配置了 cdp_url 时，无头浏览器通过 CDP 连接到外部常驻的 Chromium。
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_ms: int = 300000,
+        contexts_per_browser: int = 8,
+        cdp_url: Optional[str] = None,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_ms = idle_ms
+        self.contexts_per_browser = contexts_per_browser
+        self.cdp_url = cdp_url
+        self._playwright: Optional[Playwright] = None
+        self._start_lock = asyncio.Lock()
+        self._entries: Dict[PoolKey, List[_PooledBrowser]] = {}
+        self._slots: Dict[PoolKey, asyncio.Semaphore] = {}
+        self._checkout_locks: Dict[PoolKey, asyncio.Lock] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        headless: bool = True,
+        slow_mo: Optional[float] = None,
+        **context_options,
+    ) -> AsyncIterator[BrowserContext]:
+        """
+        借出一个浏览器上下文
+
+        Args:
+            headless: 是否无头模式
+            slow_mo: 慢动作延迟（毫秒），仅可视化模式使用
+            **context_options: 传给 browser.new_context 的参数（如 viewport）
+
+        Yields:
+            新建的浏览器上下文，退出时自动关闭
+        """
+        if not headless:
+            # 有头浏览器会显示窗口，随调用结束关闭，不放入池中
+            browser = await self._launch(headless, slow_mo)
+            try:
+                yield await browser.new_context(**context_options)
+            finally:
+                await self._close_browser(browser)
+            return
+
+        key = (headless, slow_mo)
+        slots = self._slots.setdefault(
+            key, asyncio.Semaphore(self.max_size * self.contexts_per_browser)
+        )
+        async with slots:
+            async with self._checkout_locks.setdefault(key, asyncio.Lock()):
+                entry = await self._checkout(key)
+            context = None
+            try:
+                context = await entry.browser.new_context(**context_options)
+                yield context
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        log.debug(f"关闭浏览器上下文失败: {e}")
+                await self._checkin(key, entry)
+
+    async def close(self):
+        """关闭池中所有浏览器并停止 Playwright"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for entries in self._entries.values():
+            for entry in entries:
+                await self._close_browser(entry.browser)
+        self._entries.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+            log.info("浏览器池已关闭")
+
+    async def _checkout(self, key: PoolKey) -> _PooledBrowser:
+        """取出一个仍有余量的浏览器，都满载时新启动"""
+        entries = self._entries.setdefault(key, [])
+        entries[:] = [e for e in entries if e.browser.is_connected()]
+
+        available = [e for e in entries if e.active < self.contexts_per_browser]
+        if available:
+            # 优先复用负载最高的浏览器，让空闲浏览器尽快被回收
+            entry = max(available, key=lambda e: e.active)
+        else:
+            entry = _PooledBrowser(await self._launch(*key))
+            entries.append(entry)
+            self._start_reaper()
+
+        entry.active += 1
+        return entry
+
+    async def _checkin(self, key: PoolKey, entry: _PooledBrowser):
+        """归还浏览器，已断开的直接丢弃"""
+        entry.active -= 1
+        entry.last_used = time.monotonic()
+        if not entry.browser.is_connected():
+            entries = self._entries.get(key, [])
+            if entry in entries:
+                entries.remove(entry)
+
+    def _start_reaper(self):
+        """启动定时回收任务（已在运行时跳过）"""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def _reap_loop(self):
+        """定时回收各组的空闲浏览器，没有新请求时也能释放"""
+        interval = max(self.idle_ms / 2000, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            for key in list(self._entries):
+                try:
+                    await self._reap_idle(key)
+                except Exception as e:
+                    log.debug(f"回收空闲浏览器失败: {e}")
+
+    async def _reap_idle(self, key: PoolKey):
+        """回收空闲超时的浏览器"""
+        entries = self._entries.get(key)
+        if not entries:
+            return
+        deadline = time.monotonic() - self.idle_ms / 1000
+        expired = sorted(
+            (e for e in entries if e.active == 0 and e.last_used < deadline),
+            key=lambda e: e.last_used,
+        )
+        # 先同步移出池，再逐个关闭，关闭期间的借出不会拿到待关闭的浏览器
+        closing = expired[:max(len(entries) - self.min_size, 0)]
+        for entry in closing:
+            entries.remove(entry)
+        for entry in closing:
+            await self._close_browser(entry.browser)
+
+    async def _close_browser(self, browser: Browser):
+        """关闭单个浏览器"""
+        try:
+            await browser.close()
+        except Exception as e:
+            log.debug(f"关闭浏览器失败: {e}")
+
+    async def _ensure_playwright(self) -> Playwright:
+        """延迟启动 Playwright（进程内只启动一次）"""
+        async with self._start_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+                log.info("Playwright 已启动")
+        return self._playwright
+
+    async def _launch(self, headless: bool, slow_mo: Optional[float]) -> Browser:
+        """获取新浏览器：优先连接外部 CDP，其次启动 Firefox（避免 macOS 上 Chromium 崩溃），最后回退 Chromium"""
+        p = await self._ensure_playwright()
+
+        if self.cdp_url and headless:
+            try:
+                browser = await p.chromium.connect_over_cdp(self.cdp_url, slow_mo=slow_mo)
+                log.info(f"已通过 CDP 连接共享浏览器: {self.cdp_url}")
+                return browser
+            except Exception as cdp_error:
+                log.warning(f"CDP 连接失败: {cdp_error}，改为本地启动浏览器")
+
+        try:
+            browser = await p.firefox.launch(headless=headless, slow_mo=slow_mo)
+            log.info("使用 Firefox 浏览器")
+        except Exception as firefox_error:
+            log.warning(f"Firefox 启动失败: {firefox_error}，尝试使用 Chromium")
+            browser = await p.chromium.launch(
+                headless=headless,
+                slow_mo=slow_mo,
+                args=CHROMIUM_ARGS,
+            )
+        return browser
+
+
+# 全局浏览器池实例
+browser_pool = BrowserPool(
+    min_size=settings.wjx_pool_min,
+    max_size=settings.wjx_pool_max,
+    idle_ms=settings.wjx_pool_idle_ms,
+    contexts_per_browser=settings.wjx_pool_contexts_per_browser,
+    cdp_url=settings.wjx_browser_cdp_url,
+)
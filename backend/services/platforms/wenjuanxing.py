@@ -1,14 +1,343 @@
 """问卷星平台适配器"""
+import asyncio
+import contextlib
+import functools
+import json
 import re
-from typing import List, Dict, Any
-from playwright.async_api import async_playwright, Page, TimeoutError as PlaywrightTimeout
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Set, Tuple
+from playwright.async_api import Page, Route, TimeoutError as PlaywrightTimeout
 from backend.models.question import Question, QuestionType, TemplateType
 from backend.core.logger import log
 from backend.services.platforms.base import BasePlatform, PlatformType
+from backend.services.platforms.browser_pool import browser_pool
+
+
+# 可视化模式的窗口大小
+VISUAL_VIEWPORT = {"width": 1400, "height": 900}
+
+# 无头模式下拦截的资源类型（解析/填写用不到，只会拖慢页面加载）
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+# 填写答案时使用的输入控件类型（判断顺序与 _fill_answer 的分派顺序一致）
+_INPUT_KIND_JS = """(
+        f.querySelector("input[verify='多级下拉']") ? 'cascade'
+        : f.querySelector("input[type='radio']") ? 'radio'
+        : f.querySelector("input[type='checkbox']") ? 'checkbox'
+        : f.querySelector("input[type='text'], textarea") ? 'text'
+        : ''
+    )"""
+
+# 在页面内一次性探测单个题目容器（.field）的结构，返回可JSON序列化的字典
+_FIELD_PROBE_JS = """
+(f) => {
+    const label = f.querySelector('.field-label > .topichtml') || f.querySelector(':scope > .field-label');
+    const optionLabels = (selector) => Array.from(f.querySelectorAll(selector), (item) => {
+        const optionLabel = item.querySelector('div.label, .label');
+        return optionLabel ? optionLabel.innerText : '';
+    });
+    return {
+        id: f.getAttribute('id') || '',
+        type: f.getAttribute('type') || '',
+        dataType: f.getAttribute('data-type') || '',
+        required: f.classList.contains('required'),
+        gapfill: f.getAttribute('gapfill') === '1',
+        ispanduan: f.getAttribute('ispanduan') === '1',
+        content: label ? label.innerText : null,
+        radios: optionLabels('.ui-radio'),
+        checkboxes: optionLabels('.ui-checkbox'),
+        selectOptions: Array.from(f.querySelectorAll('select option'))
+            .filter((o) => { const v = o.getAttribute('value'); return v && v !== '-2'; })
+            .map((o) => o.innerText || o.textContent || ''),
+        hasSelect: !!f.querySelector('select'),
+        hasTextarea: !!f.querySelector('textarea'),
+        hasMatrix: !!f.querySelector('table.matrix-rating'),
+        hasCascade: !!f.querySelector("input[verify='多级下拉']"),
+        inputKind: """ + _INPUT_KIND_JS + """,
+    };
+}
+"""
+
+# 一次 evaluate 提取页面上所有题目容器
+_EXTRACT_ALL_JS = f"() => Array.from(document.querySelectorAll('.field'), {_FIELD_PROBE_JS.strip()})"
+
+# 填写答案所需的题型分派信息：[id, type属性, 是否多项填空, 输入控件类型]
+_FIELD_FILL_META_JS = """
+(f) => [f.id, f.getAttribute('type') || '', f.getAttribute('gapfill') === '1', """ + _INPUT_KIND_JS + """]
+"""
+
+# 一次 evaluate 获取页面上所有题目的分派信息
+_FILL_META_ALL_JS = f"() => Array.from(document.querySelectorAll('.field[id]'), {_FIELD_FILL_META_JS.strip()})"
+
+# 题型分派信息：(type属性, 是否多项填空, 输入控件类型)
+QuestionMeta = Tuple[str, bool, str]
+
+# 填写时依赖页面焦点或弹出层的题型（type属性）：多项简答、矩阵填空、简答、下拉
+_FOCUS_FIELD_TYPES = frozenset({"34", "9", "2", "7"})
+
+# 只需在页面内点击选项即可填写的输入控件类型（可并发填写）
+_CLICK_ONLY_INPUT_KINDS = frozenset({"radio", "checkbox"})
+
+# 按问卷URL缓存题型分派信息的问卷数上限
+_QUESTION_META_CACHE_SIZE = 256
+
+# 问卷解析结果（标题/描述/模板类型）的缓存有效期（秒）和问卷数上限
+_PARSE_CACHE_TTL = 300
+_PARSE_CACHE_SIZE = 256
+
+# 提交按钮候选选择器（问卷星使用div作为提交按钮），按优先级排列，均为标准CSS
+_SUBMIT_SELECTORS = [
+    "#ctlNext",  # 问卷星的提交按钮ID
+    ".submitbtn",  # 问卷星的提交按钮class
+    "div.submitbtn",  # div形式的提交按钮
+    "#divSubmit .submitbtn",  # 提交区域内的按钮
+    "button[type='submit']",  # 标准submit按钮
+    "input[type='submit']",  # input类型的提交按钮
+]
+
+# 按文字匹配的提交按钮选择器（Playwright 扩展语法，匹配较慢，CSS 候选都未命中时才尝试）
+_SUBMIT_TEXT_SELECTORS = [
+    "button:has-text('提交')",  # 包含"提交"文字的按钮
+    "div:has-text('提交')",  # 包含"提交"文字的div
+]
+
+# 在页面内按优先级返回第一个存在的选择器下标，都不存在时返回 -1
+_FIRST_PRESENT_JS = "(selectors) => selectors.findIndex((s) => document.querySelector(s) !== null)"
+
+# 在页面内按文本匹配单选项，返回 [索引, 清理后的选项文本]，未匹配时返回 null
+# （选项文本清理规则与 _RE_LETTER / _RE_NUM 一致）
+_MATCH_RADIO_OPTION_JS = """
+([name, target]) => {
+    const clean = (s) => s.trim().replace(/^[A-Z][.\u3001\\s]+/, '').replace(/^\\d+[.\u3001\\s]+/, '');
+    const radios = document.querySelectorAll(`input[type='radio'][name='${name}']`);
+    for (let i = 0; i < radios.length; i++) {
+        const parent = radios[i].closest('.ui-radio');
+        if (!parent) continue;
+        const label = parent.querySelector('.label');
+        const text = clean(label ? label.innerText : '');
+        // 空文本（纯图片、"其他"等选项）会匹配任何答案，跳过
+        if (!text) continue;
+        if (target.includes(text) || text.includes(target)) return [i, text];
+    }
+    return null;
+}
+"""
+
+# 提交后判断成功的页面关键词：确认成功 / 推测成功
+_SUCCESS_CONFIRM_KEYWORDS = ["提交成功", "已完成", "感谢您的参与"]
+_SUCCESS_GUESS_KEYWORDS = ["感谢", "完成", "成功"]
+
+# 提交后的错误/成功提示元素
+_ERROR_TIP_SELECTOR = ".error-message, .alert-danger, .tip-error, .error-tip"
+_SUCCESS_TIP_SELECTOR = ".success-message, .alert-success, .tip-success, .success-tip"
+
+# 在页面内检查提交反馈：错误提示、成功提示（含关键词确认）、关键词推测
+_SUBMIT_FEEDBACK_JS = """
+([errorSelector, successSelector, confirmKeywords, guessKeywords]) => {
+    const textOf = (selector) => {
+        const e = document.querySelector(selector);
+        return e ? e.innerText : '';
+    };
+    const text = document.title + '\\n' + (document.body ? document.body.innerText : '');
+    let success = textOf(successSelector);
+    if (!success && confirmKeywords.some((k) => text.includes(k))) success = '提交成功';
+    return {
+        error: textOf(errorSelector),
+        success,
+        guessed: guessKeywords.some((k) => text.includes(k)),
+    };
+}
+"""
+
+# 在页面内批量填写文本输入框并触发输入事件，返回找不到输入框的子项name
+_FILL_TEXT_FIELDS_JS = """
+(entries) => {
+    const missing = [];
+    for (const [name, selector, value] of entries) {
+        const el = document.querySelector(selector);
+        if (!el) { missing.push(name); continue; }
+        el.focus();
+        el.value = value;
+        for (const type of ['input', 'change', 'blur']) {
+            el.dispatchEvent(new Event(type, { bubbles: true }));
+        }
+    }
+    return missing;
+}
+"""
+
+# 在页面内判断下拉框类型：不存在返回 missing，select2 插件返回 select2（由 Python 点击），
+# 原生 select 直接按 value 选中并触发 change 事件，返回 native（无此选项时返回 no_option）
+_SELECT_DROPDOWN_JS = """
+([name, value]) => {
+    const select = document.querySelector(`select[name='${name}']`);
+    if (!select) return 'missing';
+    const next = select.nextElementSibling;
+    if (next && next.classList.contains('select2')) return 'select2';
+    if (!Array.from(select.options).some((o) => o.value === value)) return 'no_option';
+    select.value = value;
+    select.dispatchEvent(new Event('input', { bubbles: true }));
+    select.dispatchEvent(new Event('change', { bubbles: true }));
+    return 'native';
+}
+"""
+
+# 在页面内按 value 点选单选/多选题的选项（点击外层 ui-radio / ui-checkbox 容器，
+# 没有容器时直接勾选），返回找不到的 value
+_CLICK_OPTIONS_JS = """
+([kind, name, values]) => {
+    const missing = [];
+    for (const value of values) {
+        const input = document.querySelector(`input[type='${kind}'][name='${name}'][value='${value}']`);
+        if (!input) { missing.push(value); continue; }
+        const parent = input.closest(`.ui-${kind}`);
+        if (parent) {
+            parent.click();
+        } else if (!input.checked) {
+            input.checked = true;
+            input.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+    }
+    return missing;
+}
+"""
+
+# 级联下拉点击后弹出的选择器
+_CASCADE_PICKER_SELECTOR = ".weui-picker, .cascade-picker"
+
+# 问卷标题候选选择器（匹配问卷星的不同页面结构，按优先级排列）
+_TITLE_SELECTORS = [
+    ".surveyhead h1",           # 标准问卷星样式
+    ".survey-title",            # 备选样式
+    "h1.title",                 # 标题class
+    ".jqTitle",                 # 问卷星特定class
+    "div.title h1",             # div包裹的标题
+    "#divTitle h1",             # ID选择器
+    "h1",                       # 通用h1标签
+    ".topicTitle",              # 题目标题区域
+]
+
+# 在页面内按优先级查找第一个非空标题，同时取页面title和问卷描述
+_HEADER_JS = """
+(selectors) => {
+    let title = '', selector = null;
+    for (const s of selectors) {
+        const e = document.querySelector(s);
+        const text = e ? e.innerText.trim() : '';
+        if (text) { title = text; selector = s; break; }
+    }
+    const desc = document.querySelector('.surveyhead .description, .survey-description');
+    return {
+        title,
+        selector,
+        documentTitle: document.title || '',
+        description: desc ? desc.innerText : '',
+    };
+}
+"""
+
+# 题目/选项文本清理用的正则（模块级预编译）
+_RE_STAR = re.compile(r'^\*+\s*')  # 开头的星号
+_RE_NUM = re.compile(r'^\d+[\.\、\s]+')  # 开头的数字题号/序号
+_RE_BRACKET = re.compile(r'^\[\s*[必选单多判填]\s*\]\s*')  # 开头的[单]/[多]等标记
+_RE_LETTER = re.compile(r'^[A-Z][\.\、\s]+')  # 开头的字母序号
+
+# 模板类型检测关键词
+_EXAM_KEYWORDS = ["考试", "测试", "考核", "exam", "test"]
+_SURVEY_KEYWORDS = ["调查", "问卷", "survey", "questionnaire"]
+# 两组关键词合并为一个带命名分组的正则，一次扫描页面即可按 lastgroup 归类
+_TEMPLATE_KEYWORDS_RE = re.compile(
+    f"(?P<exam>{'|'.join(_EXAM_KEYWORDS)})|(?P<survey>{'|'.join(_SURVEY_KEYWORDS)})",
+    re.IGNORECASE,
+)
+
+# 在页面内统计各组关键词中出现过的关键词个数（基于页面标题和可见文本，无需序列化整页HTML）
+_KEYWORD_SCORES_JS = """
+(groups) => {
+    const text = (document.title + '\\n' + (document.body ? document.body.innerText : '')).toLowerCase();
+    return groups.map((keywords) => keywords.filter((k) => text.includes(k)).length);
+}
+"""
+
+# 中文圈号数字 -> 阿拉伯数字
+_CN_NUM = {
+    '①': 1, '②': 2, '③': 3, '④': 4, '⑤': 5,
+    '⑥': 6, '⑦': 7, '⑧': 8, '⑨': 9, '⑩': 10,
+    '⑪': 11, '⑫': 12, '⑬': 13, '⑭': 14, '⑮': 15,
+    '⑯': 16, '⑰': 17, '⑱': 18, '⑲': 19, '⑳': 20,
+}
+_CIRCLED = frozenset(_CN_NUM)
+
+# 选项答案索引：纯数字（如 "2"）或以字母开头（如 "B"、"B. 选项内容"）
+_ANSWER_INDEX_RE = re.compile(r'(?P<num>\d+)$|(?P<letter>[A-Za-z])', re.ASCII)
+_A_ORD = ord('A')
+_ANSWER_INDEX_PARSERS = {
+    "num": int,
+    "letter": lambda letter: ord(letter.upper()) - _A_ORD,
+}
+
+# 判断题选项关键词
+_TRUE_FALSE_KEYWORDS = ["正确", "错误", "对", "错", "是", "否", "true", "false", "yes", "no"]
+
+
+def _lru_put(cache: OrderedDict, key: str, value: Any, max_size: int):
+    """写入按问卷URL缓存的数据（超出上限时淘汰最早写入的问卷）"""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+def _option_text(option_labels: Optional[List[str]], index: int) -> str:
+    """从缓存的选项文本中取出指定索引的文本（无缓存或越界时返回空字符串）"""
+    if option_labels and 0 <= index < len(option_labels):
+        return option_labels[index]
+    return ""
+
+
+def _gap_position(sub_name: str) -> Optional[int]:
+    """从多项填空子项name（如 q10_2）中解析第几空，无法解析时返回 None"""
+    position = sub_name.rsplit('_', 1)[-1]
+    return int(position) if position.isdigit() else None
+
+
+async def _block_heavy_resource(route: Route):
+    """中止图片/字体/媒体请求，其余请求照常放行"""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _install_blockers(page: Page):
+    """为页面注册资源拦截"""
+    await page.route("**/*", _block_heavy_resource)
 
 
 class WenjuanxingPlatform(BasePlatform):
-    """问卷星平台适配器"""
+    """
+    问卷星平台适配器
+
+    整个进程共享一个实例（见 PLATFORM_REGISTRY），实例上的三个缓存按清理后的问卷URL
+    存放，被所有会话共同读写：
+    - _question_meta / _option_labels：每次提取题目时整体覆盖；提交时缓存缺少本次答案中的
+      题目则重新探测并覆盖题型信息。不按时间过期，问卷被修改后需重新提取题目才会更新。
+    - _parse_cache：写入后 _PARSE_CACHE_TTL 秒内有效，过期后下次解析时重新打开页面并覆盖。
+    每个缓存最多保留 _QUESTION_META_CACHE_SIZE / _PARSE_CACHE_SIZE 个问卷，超出时淘汰最早
+    写入的问卷。缓存值只整体替换、不原地修改，读写之间没有 await，并发会话读到的总是某次
+    完整写入的结果。
+    """
+
+    __slots__ = ("_question_meta", "_option_labels", "_parse_cache")
+
+    def __init__(self):
+        # 问卷URL -> {题目容器ID: 题型分派信息}，提取题目时写入，提交时直接使用
+        self._question_meta: "OrderedDict[str, Dict[str, QuestionMeta]]" = OrderedDict()
+        # 问卷URL -> {题目容器ID: 清理后的选项文本}，文本匹配答案、记录日志时无需再读取页面
+        self._option_labels: "OrderedDict[str, Dict[str, List[str]]]" = OrderedDict()
+        # 问卷URL -> (缓存时间, 解析结果)，短时间内重复解析同一问卷时无需再打开浏览器
+        self._parse_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
 
     @property
     def platform_name(self) -> PlatformType:
@@ -27,145 +356,133 @@ class WenjuanxingPlatform(BasePlatform):
         if not await self.validate_url(url):
             raise ValueError("无效的URL")
 
-        async with async_playwright() as p:
-            # 可视化模式：显示浏览器窗口
-            # 使用 Firefox 以避免 macOS 上 Chromium 的崩溃问题
-            try:
-                browser = await p.firefox.launch(
-                    headless=not visual_mode,
-                    slow_mo=500 if visual_mode else None,
-                )
-            except Exception:
-                browser = await p.chromium.launch(
-                    headless=not visual_mode,
-                    slow_mo=500 if visual_mode else None,
-                    args=['--disable-dev-shm-usage', '--disable-gpu', '--no-sandbox']
-                )
+        # 非可视化模式下优先使用缓存的解析结果（可视化模式需要实际打开页面）
+        if not visual_mode:
+            cached = self._parse_cache.get(url)
+            if cached and time.monotonic() - cached[0] < _PARSE_CACHE_TTL:
+                log.debug(f"使用缓存的问卷解析结果: {url}")
+                return dict(cached[1])
+
+        # 可视化模式：显示浏览器窗口（窗口更大）；解析无需观看，不使用慢动作
+        async with browser_pool.acquire(
+            headless=not visual_mode,
+            viewport=VISUAL_VIEWPORT if visual_mode else None,
+        ) as context:
+            page = await context.new_page()
+            if not visual_mode:
+                await _install_blockers(page)
+
+            # 不等待 networkidle：问卷页的统计/长轮询请求可能让它迟迟不触发
+            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
             try:
-                page = await browser.new_page()
+                await page.wait_for_selector(".surveyhead h1, .jqTitle, h1", timeout=5000)
+            except PlaywrightTimeout:
+                log.debug("未等到标题元素，继续使用降级方式提取标题")
+            
+            # 获取问卷标题和描述
+            header = await self._extract_header(page)
+            
+            # 检测模板类型
+            template_type = await self.detect_template_type_live(page)
+            
+            result = {
+                "url": url,
+                "platform": self.platform_name.value,
+                "template_type": template_type.value,
+                "title": header["title"],
+                "description": header["description"],
+            }
 
-                # 设置窗口大小（可视化模式下更大）
-                if visual_mode:
-                    await page.set_viewport_size({"width": 1400, "height": 900})
+        self._remember_parse_result(url, result)
+        return dict(result)
 
-                await page.goto(url, wait_until="networkidle", timeout=30000)
-                
-                # 获取问卷标题
-                title = await self._extract_title(page)
-                
-                # 获取问卷描述
-                description = await self._extract_description(page)
-                
-                # 检测模板类型
-                page_content = await page.content()
-                template_type = self.detect_template_type(page_content)
-                
-                return {
-                    "url": url,
-                    "platform": self.platform_name.value,
-                    "template_type": template_type.value,
-                    "title": title,
-                    "description": description,
-                }
-                
-            finally:
-                await browser.close()
+    def _remember_parse_result(self, url: str, result: Dict[str, Any]):
+        """缓存问卷解析结果（超出上限时淘汰最早的问卷）"""
+        _lru_put(self._parse_cache, url, (time.monotonic(), result), _PARSE_CACHE_SIZE)
     
     async def extract_questions(self, url: str, visual_mode: bool = False) -> tuple[List[Question], Dict[str, Any]]:
         """提取题目列表"""
         url = self._clean_url(url)
-        async with async_playwright() as p:
-            # 可视化模式：显示浏览器窗口
-            # 使用 Firefox 以避免 macOS 上 Chromium 的崩溃问题
-            try:
-                browser = await p.firefox.launch(
-                    headless=not visual_mode,
-                    slow_mo=500 if visual_mode else None,
-                )
-            except Exception:
-                browser = await p.chromium.launch(
-                    headless=not visual_mode,
-                    slow_mo=500 if visual_mode else None,
-                    args=['--disable-dev-shm-usage', '--disable-gpu', '--no-sandbox']
-                )
-            try:
-                page = await browser.new_page()
-
-                # 设置窗口大小
-                if visual_mode:
-                    await page.set_viewport_size({"width": 1400, "height": 900})
+        # 可视化模式：显示浏览器窗口；提取题目无需观看，不使用慢动作
+        async with browser_pool.acquire(
+            headless=not visual_mode,
+            viewport=VISUAL_VIEWPORT if visual_mode else None,
+        ) as context:
+            page = await context.new_page()
+            if not visual_mode:
+                await _install_blockers(page)
 
-                await page.goto(url, wait_until="networkidle", timeout=30000)
-                
-                # 等待题目加载
-                await page.wait_for_selector(".field", timeout=10000)
-                
-                # 获取问卷元数据
-                metadata = {
-                    "title": await self._extract_title(page),
-                    "description": await self._extract_description(page),
-                }
-                
-                # 提取所有题目
-                questions = await self._extract_all_questions(page)
-                
-                log.info(f"成功提取 {len(questions)} 道题目")
-                
-                return questions, metadata
-                
-            finally:
-                await browser.close()
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            
+            # 等待题目加载（以题目元素出现作为页面就绪的依据）
+            await page.wait_for_selector(".field", timeout=10000)
+            
+            # 获取问卷元数据
+            metadata = await self._extract_header(page)
+            
+            # 提取所有题目
+            questions = await self._extract_all_questions(page, url)
+            
+            log.info(f"成功提取 {len(questions)} 道题目")
+            
+            return questions, metadata
     
     async def submit_answers(self, url: str, answers: Dict[str, Any], visual_mode: bool = False) -> Dict[str, Any]:
         """提交答案"""
         url = self._clean_url(url)
-        async with async_playwright() as p:
-            # 可视化模式：显示浏览器窗口，慢动作
-            # 使用 Firefox 以避免 macOS 上 Chromium 的崩溃问题
+        # 可视化模式：显示浏览器窗口，慢动作（更慢，方便用户观看）
+        async with browser_pool.acquire(
+            headless=not visual_mode,
+            slow_mo=800 if visual_mode else None,
+            viewport=VISUAL_VIEWPORT if visual_mode else None,
+        ) as context:
             try:
-                browser = await p.firefox.launch(
-                    headless=not visual_mode,
-                    slow_mo=800 if visual_mode else None,  # 可视化模式更慢，方便用户观看
-                )
-                log.info("使用 Firefox 浏览器")
-            except Exception as firefox_error:
-                # 如果 Firefox 不可用，回退到 Chromium（使用更稳定的参数）
-                log.warning(f"Firefox 启动失败: {firefox_error}，尝试使用 Chromium")
-                browser = await p.chromium.launch(
-                    headless=not visual_mode,
-                    slow_mo=800 if visual_mode else None,
-                    args=[
-                        '--disable-dev-shm-usage',
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-gpu',
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                    ]
-                )
-            try:
-                page = await browser.new_page()
+                page = await context.new_page()
 
-                # 设置窗口大小和位置
                 if visual_mode:
-                    await page.set_viewport_size({"width": 1400, "height": 900})
                     log.info("🌐 可视化模式：浏览器窗口已打开")
+                else:
+                    await _install_blockers(page)
 
-                await page.goto(url, wait_until="networkidle", timeout=30000)
+                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
                 
-                # 等待页面加载
+                # 等待题目加载（以题目元素出现作为页面就绪的依据）
                 await page.wait_for_selector(".field", timeout=10000)
                 
-                # 填写答案
-                for question_id, answer_content in answers.items():
+                # 题型分派信息：优先用提取题目时缓存的结果，缺失时一次 evaluate 全部获取
+                question_meta = self._question_meta.get(url)
+                if question_meta is None or not question_meta.keys() >= answers.keys():
+                    question_meta = await self._probe_question_meta(page, url)
+                option_labels = self._option_labels.get(url, {})
+
+                # 填写答案：各题互不依赖，并发填写。协议消息虽然按序发送，但页面焦点和键盘输入
+                # 是整页共享的状态，fill/focus 并发会把答案输入到别的题目中，因此除单选/多选
+                # （只在页面内点击）外的题型都通过 focus_lock 逐题串行（见 _fill_answer）
+                focus_lock = asyncio.Lock()
+
+                async def fill_one(question_id: str, answer_content: Any):
                     # 预处理答案内容
                     processed_answer = self._preprocess_answer(answer_content)
                     if processed_answer is not None:
-                        await self._fill_answer(page, question_id, processed_answer)
+                        await self._fill_answer(
+                            page, question_id, processed_answer, focus_lock,
+                            meta=question_meta.get(question_id),
+                            option_labels=option_labels.get(question_id),
+                        )
                         if visual_mode:
                             log.info(f"✓ 可视化模式：已填写 {question_id}")
                     else:
                         log.warning(f"跳过无效答案: {question_id} = {answer_content}")
 
+                # 单题异常不中断其余题目的填写，统一记录后继续提交
+                fill_results = await asyncio.gather(
+                    *(fill_one(question_id, answer_content) for question_id, answer_content in answers.items()),
+                    return_exceptions=True,
+                )
+                for question_id, fill_result in zip(answers, fill_results):
+                    if isinstance(fill_result, Exception):
+                        log.error(f"填写题目 {question_id} 异常: {fill_result}")
+
                 # 可视化模式：不自动提交，让用户手动操作
                 if visual_mode:
                     log.info("=" * 60)
@@ -175,81 +492,77 @@ class WenjuanxingPlatform(BasePlatform):
                     log.info("📌 浏览器窗口将保持打开，方便您操作")
                     log.info("=" * 60)
 
-                    # 等待用户操作（保持浏览器打开10分钟）
-                    import asyncio
-                    log.info("⏰ 浏览器将保持打开10分钟，供您检查和提交...")
-                    await asyncio.sleep(600)  # 10分钟 = 600秒
+                    # 等待用户提交（跳转到完成页）或关闭窗口，最多10分钟
+                    log.info("⏰ 浏览器将保持打开，最多等待10分钟供您检查和提交...")
+                    try:
+                        await page.wait_for_url("**/complete**", timeout=600_000)
+                        auto_submitted = True
+                        log.info("✅ 检测到用户已提交问卷")
+                    except PlaywrightTimeout:
+                        auto_submitted = False
+                        log.info("⏰ 等待超时，用户未提交")
+                    except Exception as e:
+                        # 用户关闭了页面或浏览器
+                        auto_submitted = False
+                        log.info(f"浏览器窗口已关闭: {e}")
 
-                    # 返回成功状态，但标记为未提交
                     return {
                         "success": True,
-                        "message": "答案填写完成，等待用户手动提交",
+                        "message": "用户已提交问卷" if auto_submitted else "答案填写完成，等待用户手动提交",
                         "visual_mode": True,
-                        "auto_submitted": False,
+                        "auto_submitted": auto_submitted,
                     }
 
                 # 非可视化模式：自动提交表单
-                # 提交表单 - 问卷星使用div作为提交按钮
+                # 提交表单 - 一次 evaluate 按优先级检查全部CSS候选，都未命中再尝试按文字匹配
                 submit_button = None
-                possible_selectors = [
-                    "#ctlNext",  # 问卷星的提交按钮ID
-                    ".submitbtn",  # 问卷星的提交按钮class
-                    "div.submitbtn",  # div形式的提交按钮
-                    "#divSubmit .submitbtn",  # 提交区域内的按钮
-                    "button[type='submit']",  # 标准submit按钮
-                    "input[type='submit']",  # input类型的提交按钮
-                    "button:has-text('提交')",  # 包含"提交"文字的按钮
-                    "div:has-text('提交')",  # 包含"提交"文字的div
-                ]
+                index = await page.evaluate(_FIRST_PRESENT_JS, _SUBMIT_SELECTORS)
+                possible_selectors = [_SUBMIT_SELECTORS[index]] if index >= 0 else _SUBMIT_TEXT_SELECTORS
                 
                 for selector in possible_selectors:
                     locator = page.locator(selector)
-                    if await locator.count() > 0:
+                    if index >= 0 or await locator.count() > 0:
                         submit_button = locator.first
                         log.info(f"找到提交按钮: {selector}")
                         break
                 
                 if submit_button:
-                    # 滚动到提交按钮位置
-                    try:
-                        await submit_button.scroll_into_view_if_needed()
-                        await page.wait_for_timeout(500)  # 等待滚动完成
-                    except:
-                        pass
-                    
-                    # 点击提交按钮
+                    # 点击提交按钮（click 会自动滚动到按钮位置并等待其可点击）
                     await submit_button.click(timeout=5000)
                     log.info("已点击提交按钮，等待响应...")
-                    
+                
                     # 等待提交完成（增加等待时间到10秒）
                     try:
                         await page.wait_for_url("**/complete**", timeout=10000)
                         result = {"success": True, "message": "提交成功"}
                         log.info("提交成功：URL已跳转到完成页")
                     except PlaywrightTimeout:
-                        # 等待一下，让页面有时间处理
-                        await page.wait_for_timeout(2000)
-                        
-                        # 检查是否有错误提示
-                        error_msg = await self._extract_error_message(page)
+                        # 等待错误/成功提示出现，最多等待2秒让页面处理
+                        try:
+                            await page.wait_for_selector(
+                                f"{_ERROR_TIP_SELECTOR}, {_SUCCESS_TIP_SELECTOR}", state="attached", timeout=2000
+                            )
+                        except PlaywrightTimeout:
+                            log.debug("未出现错误/成功提示元素")
+                    
+                        # 一次 evaluate 检查错误提示、成功提示和页面关键词
+                        feedback = await self._check_submit_feedback(page)
+                        error_msg = feedback.get("error")
+                        success_msg = feedback.get("success")
                         if error_msg:
                             result = {"success": False, "message": f"提交失败: {error_msg}"}
                             log.warning(f"提交失败: {error_msg}")
-                        else:
+                        elif success_msg:
                             # 即使URL没有跳转，也检查是否有成功提示
-                            success_msg = await self._check_success_message(page)
-                            if success_msg:
-                                result = {"success": True, "message": success_msg}
-                                log.info(f"提交成功: {success_msg}")
-                            else:
-                                # 检查页面内容，可能已经成功但没有明显提示
-                                page_content = await page.content()
-                                if any(kw in page_content for kw in ["感谢", "完成", "成功"]):
-                                    result = {"success": True, "message": "提交完成（推测）"}
-                                    log.info("提交可能成功（页面包含成功关键词）")
-                                else:
-                                    result = {"success": False, "message": "提交超时或未找到成功确认"}
-                                    log.warning("提交超时或未找到成功确认")
+                            result = {"success": True, "message": success_msg}
+                            log.info(f"提交成功: {success_msg}")
+                        elif feedback.get("guessed"):
+                            # 可能已经成功但没有明显提示
+                            result = {"success": True, "message": "提交完成（推测）"}
+                            log.info("提交可能成功（页面包含成功关键词）")
+                        else:
+                            result = {"success": False, "message": "提交超时或未找到成功确认"}
+                            log.warning("提交超时或未找到成功确认")
                 else:
                     # 记录页面HTML用于调试
                     log.warning("未找到提交按钮，页面可能结构不同")
@@ -266,347 +579,340 @@ class WenjuanxingPlatform(BasePlatform):
             except Exception as e:
                 log.error(f"提交答案失败: {e}")
                 return {"success": False, "message": str(e)}
-            finally:
-                await browser.close()
     
     def detect_template_type(self, page_content: str) -> TemplateType:
         """检测模板类型"""
-        # 简单检测：查找关键词
-        exam_keywords = ["考试", "测试", "考核", "exam", "test"]
-        survey_keywords = ["调查", "问卷", "survey", "questionnaire"]
-        
-        page_lower = page_content.lower()
-        
-        exam_score = sum(1 for kw in exam_keywords if kw in page_lower)
-        survey_score = sum(1 for kw in survey_keywords if kw in page_lower)
+        # 简单检测：统计出现过的不同关键词个数（单次扫描，忽略大小写，无需复制整页小写文本）
+        found: Dict[str, Set[str]] = {"exam": set(), "survey": set()}
+        for m in _TEMPLATE_KEYWORDS_RE.finditer(page_content):
+            found[m.lastgroup].add(m.group(0).lower())
+        exam_score = len(found["exam"])
+        survey_score = len(found["survey"])
         
         if exam_score > survey_score:
             return TemplateType.EXAM
         else:
             return TemplateType.SURVEY
-    
-    async def _extract_title(self, page: Page) -> str:
-        """提取问卷标题"""
-        # 尝试多种选择器匹配问卷星的不同页面结构
-        selectors = [
-            ".surveyhead h1",           # 标准问卷星样式
-            ".survey-title",            # 备选样式
-            "h1.title",                 # 标题class
-            ".jqTitle",                 # 问卷星特定class
-            "div.title h1",             # div包裹的标题
-            "#divTitle h1",             # ID选择器
-            "h1",                       # 通用h1标签
-            ".topicTitle",              # 题目标题区域
-        ]
-
-        for selector in selectors:
-            try:
-                title_elem = page.locator(selector).first
-                if await title_elem.count() > 0:
-                    title_text = await title_elem.inner_text()
-                    title_text = title_text.strip()
-                    if title_text and len(title_text) > 0:
-                        log.info(f"成功提取问卷标题: {title_text} (使用选择器: {selector})")
-                        return title_text
-            except Exception as e:
-                log.debug(f"选择器 {selector} 提取标题失败: {e}")
-                continue
 
-        # 如果所有选择器都失败，尝试从页面title标签提取
+    async def detect_template_type_live(self, page: Page) -> TemplateType:
+        """在页面内检测模板类型（只读取可见文本，避免 page.content() 序列化整页HTML）"""
         try:
-            page_title = await page.title()
-            if page_title and "问卷星" not in page_title:
-                # 清理页面标题（移除网站名称等）
-                clean_title = page_title.split('-')[0].split('_')[0].strip()
-                if clean_title:
-                    log.info(f"从页面title提取问卷标题: {clean_title}")
-                    return clean_title
+            exam_score, survey_score = await page.evaluate(
+                _KEYWORD_SCORES_JS, [_EXAM_KEYWORDS, _SURVEY_KEYWORDS]
+            )
         except Exception as e:
-            log.debug(f"从页面title提取标题失败: {e}")
+            log.debug(f"页面内检测模板类型失败: {e}，改用页面HTML检测")
+            return self.detect_template_type(await page.content())
+
+        if exam_score > survey_score:
+            return TemplateType.EXAM
+        else:
+            return TemplateType.SURVEY
+    
+    async def _extract_header(self, page: Page) -> Dict[str, str]:
+        """提取问卷标题和描述（在页面内一次 evaluate 完成选择器回退）"""
+        try:
+            header = await page.evaluate(_HEADER_JS, _TITLE_SELECTORS)
+        except Exception as e:
+            log.debug(f"提取问卷标题/描述失败: {e}")
+            header = {}
+
+        return {
+            "title": self._resolve_title(header),
+            "description": header.get("description") or "",
+        }
+
+    def _resolve_title(self, header: Dict[str, Any]) -> str:
+        """根据页面内探测结果确定问卷标题"""
+        title_text = (header.get("title") or "").strip()
+        if title_text:
+            log.info(f"成功提取问卷标题: {title_text} (使用选择器: {header.get('selector')})")
+            return title_text
+
+        # 如果所有选择器都失败，尝试从页面title标签提取
+        page_title = header.get("documentTitle") or ""
+        if page_title and "问卷星" not in page_title:
+            # 清理页面标题（移除网站名称等）
+            clean_title = page_title.split('-')[0].split('_')[0].strip()
+            if clean_title:
+                log.info(f"从页面title提取问卷标题: {clean_title}")
+                return clean_title
 
         log.warning("无法提取问卷标题，使用默认值")
         return "未命名问卷"
     
-    async def _extract_description(self, page: Page) -> str:
-        """提取问卷描述"""
+    async def _extract_all_questions(self, page: Page, url: Optional[str] = None) -> List[Question]:
+        """提取所有题目（在页面内一次性提取全部题目结构，再在Python中解析）"""
         try:
-            desc_elem = page.locator(".surveyhead .description, .survey-description")
-            if await desc_elem.count() > 0:
-                return await desc_elem.first.inner_text()
-        except:
-            pass
-        return ""
-    
-    async def _extract_all_questions(self, page: Page) -> List[Question]:
-        """提取所有题目"""
+            raw_fields = await page.evaluate(_EXTRACT_ALL_JS)
+        except Exception as e:
+            log.warning(f"批量提取题目失败: {e}，改为逐题解析")
+            return await self._extract_questions_by_element(page)
+
+        if url:
+            # 顺带缓存题型分派信息和选项文本，提交时无需再探测题型、读取选项
+            self._remember_question_meta(url, {
+                raw["id"]: (raw.get("type", ""), bool(raw.get("gapfill")), raw.get("inputKind", ""))
+                for raw in raw_fields
+                if raw.get("id")
+            })
+            _lru_put(self._option_labels, url, {
+                raw["id"]: [self._clean_option_text(label) for label in raw.get("radios") or raw["checkboxes"]]
+                for raw in raw_fields
+                if raw.get("id") and (raw.get("radios") or raw.get("checkboxes"))
+            }, _QUESTION_META_CACHE_SIZE)
+
         questions = []
-        
-        # 查找所有题目容器
-        field_elements = await page.locator(".field").all()
-        
-        for index, field_elem in enumerate(field_elements, start=1):
+        for index, raw in enumerate(raw_fields, start=1):
             try:
-                question = await self._parse_question_element(field_elem, index)
-                if question:
-                    questions.append(question)
-                    log.debug(f"成功解析第 {index} 题: {question.type.value} - {question.content[:30]}")
+                question = self._build_question_from_raw(raw, index)
+                questions.append(question)
+                log.debug(f"成功解析第 {index} 题: {question.type.value} - {question.content[:30]}")
             except Exception as e:
                 log.error(f"解析第 {index} 题失败: {e}")
-                # 即使解析失败，也尝试创建一个基本的题目对象
-                try:
-                    question_id = await field_elem.get_attribute("id") or f"div{index}"
-                    fallback_question = Question(
-                        id=self.normalize_question_id(question_id),
-                        type=QuestionType.FILL_BLANK,  # 默认为填空题
-                        content=f"题目{index}（解析失败，请手动检查）",
-                        options=None,
-                        order=index,
-                        required=True,
-                        platform_data={"parse_error": str(e)},
-                    )
-                    questions.append(fallback_question)
-                    log.warning(f"第 {index} 题使用降级方案")
-                except:
-                    log.error(f"第 {index} 题完全解析失败，跳过")
-                    continue
-        
+                # 即使解析失败，也创建一个基本的题目对象
+                questions.append(Question(
+                    id=self.normalize_question_id(raw.get("id") or f"div{index}"),
+                    type=QuestionType.FILL_BLANK,  # 默认为填空题
+                    content=f"题目{index}（解析失败，请手动检查）",
+                    options=None,
+                    order=index,
+                    required=True,
+                    platform_data={"parse_error": str(e)},
+                ))
+                log.warning(f"第 {index} 题使用降级方案")
+
         return questions
-    
-    async def _parse_question_element(self, field_elem, order: int) -> Question:
-        """解析单个题目元素"""
-        # 获取题目ID
-        question_id = await field_elem.get_attribute("id") or f"q{order}"
 
-        # 获取题目内容 - 优先使用 .field-label 下的 .topichtml
-        try:
-            # 方法1: 查找 .field-label > .topichtml（最精确）
-            topic_html = field_elem.locator(".field-label > .topichtml").first
-            if await topic_html.count() > 0:
-                content = await topic_html.inner_text()
-            else:
-                # 方法2: 查找直接子元素 .field-label
-                field_label = field_elem.locator("> .field-label").first
-                if await field_label.count() > 0:
-                    content = await field_label.inner_text()
-                else:
-                    # 方法3: 使用默认内容
-                    content = f"题目{order}"
-        except Exception as e:
-            log.debug(f"提取题目内容失败: {e}, 使用默认值")
+    def _build_question_from_raw(self, raw: Dict[str, Any], order: int) -> Question:
+        """根据页面内探测到的题目结构构建题目对象"""
+        question_id = raw.get("id") or f"q{order}"
+
+        # 题目内容：.field-label > .topichtml 优先，其次 .field-label
+        content = raw.get("content")
+        if content is None:
             content = f"题目{order}"
 
         # 清理题目内容（移除题号、星号等）
-        content = re.sub(r'^\*+\s*', '', content).strip()  # 移除开头的星号
-        content = re.sub(r'^\d+[\.\、\s]+', '', content).strip()
-        content = re.sub(r'^\[\s*[必选单多判填]\s*\]\s*', '', content).strip()
-        
-        # 判断题目类型
-        question_type, options = await self._detect_question_type(field_elem, content)
-        
-        # 判断是否必答
-        required = "required" in (await field_elem.get_attribute("class") or "")
-        
-        # 获取平台特定数据
-        platform_data = {
-            "element_id": question_id,
-            "field_type": await field_elem.get_attribute("data-type") or "",
-        }
-        
+        content = _RE_STAR.sub('', content).strip()  # 移除开头的星号
+        content = _RE_NUM.sub('', content).strip()
+        content = _RE_BRACKET.sub('', content).strip()
+
+        question_type, options = self._detect_question_type_from_raw(raw, content)
+
         return Question(
             id=self.normalize_question_id(question_id),
             type=question_type,
             content=content,
             options=options,
             order=order,
-            required=required,
-            platform_data=platform_data,
+            required=bool(raw.get("required")),
+            platform_data={
+                "element_id": question_id,
+                "field_type": raw.get("dataType", ""),
+            },
         )
-    
-    async def _detect_question_type(self, field_elem, content: str) -> tuple[QuestionType, list]:
-        """检测题目类型和选项"""
-        try:
-            # 获取题目的 type 属性
-            field_type = await field_elem.get_attribute("type") or ""
-
-            log.debug(f"题目类型检测: type={field_type}, content={content[:30]}")
-
-            # 检查特殊标记
-            is_gapfill = await field_elem.get_attribute("gapfill") == "1"
-
-            # 检查是否有选项容器
-            ui_radio_elements = await field_elem.locator(".ui-radio").all()
-            ui_checkbox_elements = await field_elem.locator(".ui-checkbox").all()
-
-            # 检查是否有 textarea（简答题）
-            textarea_elements = await field_elem.locator("textarea").all()
 
-            # 检查是否有 select（下拉题）
-            select_elements = await field_elem.locator("select").all()
+    def _detect_question_type_from_raw(self, raw: Dict[str, Any], content: str) -> tuple[QuestionType, list]:
+        """根据页面内探测到的题目结构判断题型和选项"""
+        field_type = raw.get("type", "")
+        has_matrix = raw.get("hasMatrix", False)
 
-            # 检查是否有表格结构（矩阵题）
-            table_elements = await field_elem.locator("table.matrix-rating").all()
+        log.debug(f"题目类型检测: type={field_type}, content={content[:30]}")
 
-            # 1. 多项填空题 (gapfill="1")
-            if is_gapfill:
-                log.debug("识别为多项填空题")
-                return QuestionType.GAP_FILL, None
+        # 1. 多项填空题 (gapfill="1")
+        if raw.get("gapfill"):
+            return QuestionType.GAP_FILL, None
 
-            # 2. 多项简答题 (type="34")
-            if field_type == "34" and table_elements:
-                log.debug("识别为多项简答题")
-                return QuestionType.MULTIPLE_ESSAY, None
+        # 2. 多项简答题 (type="34")
+        if field_type == "34" and has_matrix:
+            return QuestionType.MULTIPLE_ESSAY, None
 
-            # 3. 矩阵填空题 (type="9" with table)
-            if field_type == "9" and table_elements:
-                log.debug("识别为矩阵填空题")
-                return QuestionType.MATRIX_FILL, None
-        except Exception as e:
-            log.error(f"题型检测出错: {e}")
-            raise
+        # 3. 矩阵填空题 (type="9" with table)
+        if field_type == "9" and has_matrix:
+            return QuestionType.MATRIX_FILL, None
 
         # 4. 简答题 (type="2")
-        if field_type == "2" and textarea_elements and not table_elements:
+        if field_type == "2" and raw.get("hasTextarea") and not has_matrix:
             return QuestionType.ESSAY, None
 
-        # 5. 下拉选择题 (type="7")
-        if field_type == "7" and select_elements:
-            # 提取下拉选项
-            options = []
-            for select_elem in select_elements:
-                option_elements = await select_elem.locator("option").all()
-                for option_elem in option_elements:
-                    value = await option_elem.get_attribute("value")
-                    # 跳过"请选择"等默认选项
-                    if value and value != "-2":
-                        option_text = await option_elem.inner_text()
-                        if option_text and option_text.strip():
-                            options.append(option_text.strip())
+        # 5. 下拉选择题 (type="7")，已跳过"请选择"等默认选项
+        if field_type == "7" and raw.get("hasSelect"):
+            options = [text.strip() for text in raw.get("selectOptions", []) if text and text.strip()]
             return QuestionType.DROPDOWN, options if options else None
 
-        # 6. 级联下拉 (verify="多级下拉")
-        input_elements = await field_elem.locator("input[verify='多级下拉']").all()
-        if input_elements:
-            # 级联下拉的选项是动态加载的，无法静态解析
-            # 返回一个提示性的选项列表
-            placeholder_options = ["(级联下拉 - 选项动态加载)"]
-            log.debug("识别为级联下拉题，选项需动态加载")
-            return QuestionType.CASCADE_DROPDOWN, placeholder_options
-
-        # 7. 单选题/判断题/多选题（原有逻辑）
-        if not ui_radio_elements and not ui_checkbox_elements:
-            # 没有选项，检查是否是普通填空题
-            text_input = await field_elem.locator("input[type='text'], textarea").all()
-            if text_input:
-                return QuestionType.FILL_BLANK, None
-            # 其他情况也当作填空题
+        # 6. 级联下拉 (verify="多级下拉")，选项动态加载，无法静态解析
+        if raw.get("hasCascade"):
+            return QuestionType.CASCADE_DROPDOWN, ["(级联下拉 - 选项动态加载)"]
+
+        # 7. 单选题/判断题/多选题
+        radios = raw.get("radios", [])
+        checkboxes = raw.get("checkboxes", [])
+        if not radios and not checkboxes:
             return QuestionType.FILL_BLANK, None
-        
-        # 提取选项文本
+
+        # 提取选项文本（移除前缀字母/数字）
         options = []
-        
-        # 处理单选题选项
-        for ui_radio in ui_radio_elements:
-            try:
-                # 问卷星使用 div.label 存储选项文本
-                label_elem = ui_radio.locator("div.label, .label")
-                if await label_elem.count() > 0:
-                    option_text = await label_elem.first.inner_text()
-                    if option_text and option_text.strip():
-                        # 清理选项文本（移除前缀字母/数字）
-                        option_text = re.sub(r'^[A-Z][\.\、\s]+', '', option_text.strip())
-                        option_text = re.sub(r'^\d+[\.\、\s]+', '', option_text.strip())
-                        options.append(option_text.strip())
-            except Exception as e:
-                log.warning(f"提取单选项失败: {e}")
-                continue
-        
-        # 处理多选题选项
-        for ui_checkbox in ui_checkbox_elements:
-            try:
-                label_elem = ui_checkbox.locator("div.label, .label")
-                if await label_elem.count() > 0:
-                    option_text = await label_elem.first.inner_text()
-                    if option_text and option_text.strip():
-                        option_text = re.sub(r'^[A-Z][\.\、\s]+', '', option_text.strip())
-                        option_text = re.sub(r'^\d+[\.\、\s]+', '', option_text.strip())
-                        options.append(option_text.strip())
-            except Exception as e:
-                log.warning(f"提取多选项失败: {e}")
-                continue
-        
+        for option_text in radios + checkboxes:
+            if option_text and option_text.strip():
+                option_text = _RE_LETTER.sub('', option_text.strip())
+                option_text = _RE_NUM.sub('', option_text.strip())
+                options.append(option_text.strip())
+
         log.debug(f"提取到 {len(options)} 个选项: {options}")
-        
-        # 判断题型
-        if ui_radio_elements:
+
+        if radios:
             # 单选题或判断题
-            # 检查是否有 ispanduan 属性
-            is_panduan = await field_elem.get_attribute("ispanduan") == "1"
-            if is_panduan or (len(options) == 2 and any(
-                kw in "".join(options).lower()
-                for kw in ["正确", "错误", "对", "错", "是", "否", "true", "false", "yes", "no"]
-            )):
+            joined = "".join(options).lower()
+            if raw.get("ispanduan") or (len(options) == 2 and any(kw in joined for kw in _TRUE_FALSE_KEYWORDS)):
                 return QuestionType.TRUE_FALSE, options
-            else:
-                return QuestionType.SINGLE_CHOICE, options
-        elif ui_checkbox_elements:
-            return QuestionType.MULTIPLE_CHOICE, options
+            return QuestionType.SINGLE_CHOICE, options
+
+        return QuestionType.MULTIPLE_CHOICE, options
 
-        return QuestionType.FILL_BLANK, None
+    async def _extract_questions_by_element(self, page: Page) -> List[Question]:
+        """逐个题目容器解析（批量提取失败时的降级方案）"""
+        questions = []
+        
+        # 查找所有题目容器
+        field_elements = await page.locator(".field").all()
+
+        # 各题目互不依赖，并发解析（gather 保持输入顺序）
+        results = await asyncio.gather(
+            *(
+                self._parse_question_element(field_elem, index)
+                for index, field_elem in enumerate(field_elements, start=1)
+            ),
+            return_exceptions=True,
+        )
+        
+        for index, (field_elem, result) in enumerate(zip(field_elements, results), start=1):
+            if not isinstance(result, Exception):
+                if result:
+                    questions.append(result)
+                    log.debug(f"成功解析第 {index} 题: {result.type.value} - {result.content[:30]}")
+            else:
+                log.error(f"解析第 {index} 题失败: {result}")
+                # 即使解析失败，也尝试创建一个基本的题目对象
+                try:
+                    question_id = await field_elem.get_attribute("id") or f"div{index}"
+                    fallback_question = Question(
+                        id=self.normalize_question_id(question_id),
+                        type=QuestionType.FILL_BLANK,  # 默认为填空题
+                        content=f"题目{index}（解析失败，请手动检查）",
+                        options=None,
+                        order=index,
+                        required=True,
+                        platform_data={"parse_error": str(result)},
+                    )
+                    questions.append(fallback_question)
+                    log.warning(f"第 {index} 题使用降级方案")
+                except:
+                    log.error(f"第 {index} 题完全解析失败，跳过")
+                    continue
+        
+        return questions
+    
+    async def _parse_question_element(self, field_elem, order: int) -> Question:
+        """解析单个题目元素（一次 evaluate 探测题目结构，避免逐个 locator 往返）"""
+        raw = await field_elem.evaluate(_FIELD_PROBE_JS)
+        return self._build_question_from_raw(raw, order)
     
-    async def _fill_answer(self, page: Page, question_id: str, answer_content: Any):
-        """填写单个题目的答案"""
+    def _remember_question_meta(self, url: str, question_meta: Dict[str, QuestionMeta]):
+        """缓存问卷的题型分派信息（超出上限时淘汰最早的问卷）"""
+        _lru_put(self._question_meta, url, question_meta, _QUESTION_META_CACHE_SIZE)
+
+    async def _probe_question_meta(self, page: Page, url: str) -> Dict[str, QuestionMeta]:
+        """一次 evaluate 获取页面上所有题目的题型分派信息并缓存"""
+        try:
+            rows = await page.evaluate(_FILL_META_ALL_JS)
+        except Exception as e:
+            log.warning(f"批量获取题型信息失败: {e}，改为逐题探测")
+            return {}
+        question_meta = {row[0]: (row[1], row[2], row[3]) for row in rows}
+        self._remember_question_meta(url, question_meta)
+        return question_meta
+
+    async def _fill_answer(
+        self,
+        page: Page,
+        question_id: str,
+        answer_content: Any,
+        focus_lock: Optional[asyncio.Lock] = None,
+        meta: Optional[QuestionMeta] = None,
+        option_labels: Optional[List[str]] = None,
+    ):
+        """
+        填写单个题目的答案
+
+        Args:
+            page: 页面对象
+            question_id: 题目容器ID（如 div1）
+            answer_content: 预处理后的答案
+            focus_lock: 并发填写时串行化依赖页面焦点或弹出层的题型（除单选/多选外的所有题型）的锁
+            meta: 题型分派信息，缺省时在页面内探测
+            option_labels: 提取题目时缓存的选项文本（已清理），用于文本匹配答案和日志
+        """
         try:
             # 问卷星使用的是字段ID，如 div1, div2，但input的name是q1, q2
             # 需要转换ID格式
             input_name = question_id.replace("div", "q")
 
-            # 获取field容器
-            field = page.locator(f"#{question_id}").first
-            if not await field.count():
-                log.warning(f"未找到题目容器: {question_id}")
-                return
+            if meta is None:
+                # 获取field容器，一次 evaluate 探测题型
+                field = page.locator(f"#{question_id}").first
+                if not await field.count():
+                    log.warning(f"未找到题目容器: {question_id}")
+                    return
+                _, *meta = await field.evaluate(_FIELD_FILL_META_JS)
 
-            # 获取题目类型
-            field_type = await field.get_attribute("type") or ""
-            is_gapfill = await field.get_attribute("gapfill") == "1"
-
-            # 根据题型调用不同的填写方法
-            # 1. 多项填空题
-            if is_gapfill:
-                await self._fill_gap_fill(page, input_name, answer_content)
-
-            # 2. 多项简答题 (type="34")
-            elif field_type == "34":
-                await self._fill_multiple_essay(page, input_name, answer_content)
-
-            # 3. 矩阵填空题 (type="9")
-            elif field_type == "9":
-                await self._fill_matrix(page, input_name, answer_content)
-
-            # 4. 简答题 (type="2")
-            elif field_type == "2":
-                await self._fill_essay(page, input_name, answer_content)
-
-            # 5. 下拉选择 (type="7")
-            elif field_type == "7":
-                await self._fill_dropdown(page, input_name, answer_content)
-
-            # 6. 级联下拉
-            elif await field.locator("input[verify='多级下拉']").count() > 0:
-                await self._fill_cascade(page, input_name, answer_content)
-
-            # 7. 原有题型
-            elif await field.locator("input[type='radio']").count() > 0:
-                # 单选题/判断题
-                await self._fill_radio(page, input_name, answer_content)
-            elif await field.locator("input[type='checkbox']").count() > 0:
-                # 多选题
-                await self._fill_checkbox(page, input_name, answer_content)
-            elif await field.locator("input[type='text'], textarea").count() > 0:
-                # 填空题
-                await self._fill_text(page, input_name, answer_content)
-            else:
-                log.warning(f"未知题型: {question_id}")
+            field_type, is_gapfill, input_kind = meta
+
+            # 单选/多选只在页面内点击选项（不移动焦点），可与其他题并发；其余题型要么用 fill/focus
+            # 输入（焦点和键盘输入是整页共享的状态），要么操作全局弹出层，持 focus_lock 逐题串行
+            click_only = (
+                not is_gapfill
+                and field_type not in _FOCUS_FIELD_TYPES
+                and input_kind in _CLICK_ONLY_INPUT_KINDS
+            )
+            async with contextlib.nullcontext() if click_only or focus_lock is None else focus_lock:
+                # 根据题型调用不同的填写方法
+                # 1. 多项填空题
+                if is_gapfill:
+                    await self._fill_gap_fill(page, input_name, answer_content)
+
+                # 2. 多项简答题 (type="34")
+                elif field_type == "34":
+                    await self._fill_multiple_essay(page, input_name, answer_content)
+
+                # 3. 矩阵填空题 (type="9")
+                elif field_type == "9":
+                    await self._fill_matrix(page, input_name, answer_content)
+
+                # 4. 简答题 (type="2")
+                elif field_type == "2":
+                    await self._fill_essay(page, input_name, answer_content)
+
+                # 5. 下拉选择 (type="7")
+                elif field_type == "7":
+                    await self._fill_dropdown(page, input_name, answer_content)
+
+                # 6. 级联下拉
+                elif input_kind == "cascade":
+                    await self._fill_cascade(page, input_name, answer_content)
+
+                # 7. 原有题型
+                elif input_kind == "radio":
+                    # 单选题/判断题
+                    await self._fill_radio(page, input_name, answer_content, option_labels)
+                elif input_kind == "checkbox":
+                    # 多选题
+                    await self._fill_checkbox(page, input_name, answer_content, option_labels)
+                elif input_kind == "text":
+                    # 填空题
+                    await self._fill_text(page, input_name, answer_content)
+                else:
+                    log.warning(f"未知题型: {question_id}")
 
         except Exception as e:
             log.error(f"填写题目 {question_id} 失败: {e}")
@@ -614,8 +920,8 @@ class WenjuanxingPlatform(BasePlatform):
     def _preprocess_answer(self, answer_content: Any) -> Any:
         """预处理答案内容，确保格式正确"""
         try:
-            # 如果是None或空字符串，返回None
-            if answer_content is None or (isinstance(answer_content, str) and not answer_content.strip()):
+            # 如果是None，返回None
+            if answer_content is None:
                 return None
             
             # 如果是整数，直接返回
@@ -631,24 +937,25 @@ class WenjuanxingPlatform(BasePlatform):
                         processed_list.append(processed_item)
                 return processed_list if processed_list else None
             
-            # 处理字符串
+            # 处理字符串（只 strip 一次，空字符串返回None）
             if isinstance(answer_content, str):
                 answer_str = answer_content.strip()
+                if not answer_str:
+                    return None
                 
                 # 先尝试解析JSON数组格式 (如 "[0, 1, 2]" 或 "[0,1,2]")
                 if answer_str.startswith('[') and answer_str.endswith(']'):
                     try:
-                        import json
                         parsed = json.loads(answer_str)
                         if isinstance(parsed, list):
                             # 递归处理解析出的列表
                             return self._preprocess_answer(parsed)
-                    except:
+                    except ValueError:
                         # JSON解析失败，继续尝试其他方法
                         pass
                 
                 # 检查是否是逗号分隔的多选答案（如 "0,1,2" 或 "0, 1, 2"）
-                if ',' in answer_str and not answer_str.startswith('['):
+                elif ',' in answer_str and not answer_str.startswith('['):
                     # 分割并处理每个部分
                     parts = [p.strip() for p in answer_str.split(',') if p.strip()]
                     if all(p.isdigit() for p in parts):
@@ -657,36 +964,16 @@ class WenjuanxingPlatform(BasePlatform):
                     else:
                         # 有非数字部分，保持为列表
                         return parts
-            
-            # 如果是字符串，尝试解析
-            if isinstance(answer_content, str):
-                answer_str = answer_content.strip()
                 
-                # 如果是JSON字符串，尝试解析
-                if answer_str.startswith('"') and answer_str.endswith('"'):
+                # 如果是JSON字符串，去掉引号
+                elif answer_str.startswith('"') and answer_str.endswith('"'):
                     try:
-                        import json
                         answer_str = json.loads(answer_str)
-                    except:
+                    except ValueError:
                         pass
                 
-                # 如果包含管道符，说明是"索引|内容"格式，直接返回（解析逻辑在_fill_radio中）
-                if '|' in answer_str:
-                    return answer_str
-                
-                # 如果是纯数字，返回
-                if answer_str.isdigit():
-                    return answer_str
-                
-                # 如果包含中文圈号数字，返回
-                if any(c in answer_str for c in '①②③④⑤⑥⑦⑧⑨⑩'):
-                    return answer_str
-                
-                # 如果以字母开头（A, B, C...），返回
-                if len(answer_str) >= 1 and answer_str[0].upper() in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-                    return answer_str
-                
-                # 其他文本内容（可能是填空题答案）
+                # 其余格式（"索引|内容"、数字、圈号、字母、填空文本）原样返回，
+                # 具体解析在各 _fill_* 方法中进行
                 return answer_str
             
             # 其他类型，转为字符串
@@ -696,40 +983,50 @@ class WenjuanxingPlatform(BasePlatform):
             log.warning(f"预处理答案失败: {answer_content}, 错误: {e}")
             return None
     
-    async def _find_option_by_text(self, page: Page, input_name: str, answer_text: str) -> int:
-        """通过选项文本查找选项索引"""
+    def _clean_option_text(self, text: str) -> str:
+        """清理选项/答案文本，移除前缀字母和序号"""
+        cleaned = text.strip()
+        cleaned = _RE_LETTER.sub('', cleaned)
+        return _RE_NUM.sub('', cleaned)
+
+    async def _find_option_by_text(
+        self,
+        page: Page,
+        input_name: str,
+        answer_text: str,
+        option_labels: Optional[List[str]] = None,
+    ) -> int:
+        """通过选项文本查找选项索引（有缓存的选项文本时直接在Python中匹配）"""
         try:
-            # 获取该题目的所有选项
-            radios = await page.locator(f"input[type='radio'][name='{input_name}']").all()
-            
             # 清理答案文本，移除前缀字母和标点
-            cleaned_answer = answer_text.strip()
-            cleaned_answer = re.sub(r'^[A-Z][\.\、\s]+', '', cleaned_answer)
-            cleaned_answer = re.sub(r'^\d+[\.\、\s]+', '', cleaned_answer)
+            cleaned_answer = self._clean_option_text(answer_text)
             
             log.debug(f"清理后的答案文本: {cleaned_answer[:30]}")
+            if not cleaned_answer.strip():
+                log.warning("答案文本为空，无法按文本匹配选项")
+                return None
             
-            for i, radio in enumerate(radios):
-                try:
-                    # 获取选项的文本
-                    parent = radio.locator("xpath=ancestor::div[contains(@class, 'ui-radio')]")
-                    if await parent.count() > 0:
-                        label = await parent.first.locator(".label, div.label").inner_text()
-                        
-                        # 清理选项文本
-                        cleaned_label = label.strip()
-                        cleaned_label = re.sub(r'^[A-Z][\.\、\s]+', '', cleaned_label)
-                        cleaned_label = re.sub(r'^\d+[\.\、\s]+', '', cleaned_label)
-                        
-                        # 模糊匹配：检查答案是否在选项中，或选项是否在答案中
-                        if (cleaned_answer in cleaned_label or 
-                            cleaned_label in cleaned_answer or
-                            cleaned_answer == cleaned_label):
-                            log.info(f"✓ 通过文本匹配找到选项: 索引{i}, 文本: {cleaned_label[:40]}")
-                            return i
-                except Exception as e:
-                    log.debug(f"检查选项{i}失败: {e}")
-                    continue
+            if option_labels is not None:
+                # 先精确匹配（选项数量很少，直接用列表查找），再模糊匹配：答案在选项中，或选项在答案中
+                if cleaned_answer in option_labels:
+                    index = option_labels.index(cleaned_answer)
+                    log.info(f"✓ 通过文本匹配找到选项: 索引{index}, 文本: {cleaned_answer[:40]}")
+                    return index
+                match = next(
+                    (
+                        [i, label] for i, label in enumerate(option_labels)
+                        # 空文本（纯图片、"其他"等选项）会匹配任何答案，跳过
+                        if label.strip() and (cleaned_answer in label or label in cleaned_answer)
+                    ),
+                    None,
+                )
+            else:
+                # 在页面内一次完成选项文本的清理和匹配
+                match = await page.evaluate(_MATCH_RADIO_OPTION_JS, [input_name, cleaned_answer])
+            if match is not None:
+                index, cleaned_label = match
+                log.info(f"✓ 通过文本匹配找到选项: 索引{index}, 文本: {cleaned_label[:40]}")
+                return index
             
             log.warning(f"未找到匹配的选项文本: {cleaned_answer[:50]}")
             return None
@@ -738,213 +1035,101 @@ class WenjuanxingPlatform(BasePlatform):
             log.error(f"文本匹配失败: {e}")
             return None
     
-    def _convert_chinese_number(self, text: str) -> int:
-        """将中文圈号数字转换为阿拉伯数字"""
-        chinese_numbers = {
-            '①': 1, '②': 2, '③': 3, '④': 4, '⑤': 5, 
-            '⑥': 6, '⑦': 7, '⑧': 8, '⑨': 9, '⑩': 10,
-            '⑪': 11, '⑫': 12, '⑬': 13, '⑭': 14, '⑮': 15,
-            '⑯': 16, '⑰': 17, '⑱': 18, '⑲': 19, '⑳': 20,
-        }
-        
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _convert_chinese_number(text: str) -> int:
+        """将中文圈号数字转换为阿拉伯数字（答案写法有限，结果缓存）"""
         # 如果整个字符串是单个中文数字
-        if text in chinese_numbers:
-            return chinese_numbers[text]
+        if text in _CN_NUM:
+            return _CN_NUM[text]
         
         # 如果字符串包含中文数字，尝试提取第一个
         for char in text:
-            if char in chinese_numbers:
-                return chinese_numbers[char]
+            if char in _CN_NUM:
+                return _CN_NUM[char]
         
         raise ValueError(f"无法转换中文数字: {text}")
     
-    async def _fill_radio(self, page: Page, input_name: str, answer: Any):
+    def _parse_answer_index(self, answer: Any) -> Optional[int]:
+        """
+        解析选择题答案的选项索引（从0开始）
+
+        支持整数、纯数字字符串、圈号数字（如③④①②取第一个）、以字母开头（A, B, C...）
+        以及 "索引|内容" 格式（只解析索引部分）；无法解析时返回 None
+        """
+        if isinstance(answer, int):
+            return answer
+        if not isinstance(answer, str):
+            return None
+
+        index_part = answer.split('|', 1)[0].strip()
+        if not _CIRCLED.isdisjoint(index_part):
+            return self._convert_chinese_number(index_part) - 1
+
+        match = _ANSWER_INDEX_RE.match(index_part)
+        if match:
+            return _ANSWER_INDEX_PARSERS[match.lastgroup](match.group())
+        return None
+
+    async def _fill_radio(self, page: Page, input_name: str, answer: Any, option_labels: Optional[List[str]] = None):
         """填写单选题"""
         try:
             # 解析答案：提取索引（问卷星value从1开始，AI索引从0开始）
-            answer_index = None
-            answer_str = str(answer).strip() if answer is not None else ""
+            answer_index = self._parse_answer_index(answer)
             
-            if isinstance(answer, int):
-                answer_index = answer
-            elif isinstance(answer, str) and answer_str:
-                # 尝试多种格式解析
-                try:
-                    if '|' in answer_str:
-                        # 格式："索引|内容"，提取索引部分
-                        parts = answer_str.split('|', 1)
-                        index_part = parts[0].strip()
-                        
-                        # 尝试解析索引部分
-                        if index_part.isdigit():
-                            answer_index = int(index_part)
-                        elif any(c in index_part for c in '①②③④⑤⑥⑦⑧⑨⑩'):
-                            answer_index = self._convert_chinese_number(index_part) - 1
-                        else:
-                            if len(index_part) >= 1 and index_part[0].upper() in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-                                answer_index = ord(index_part[0].upper()) - ord('A')
-                    
-                    elif answer_str.isdigit():
-                        # 纯数字字符串
-                        answer_index = int(answer_str)
-                    
-                    elif any(c in answer_str for c in '①②③④⑤⑥⑦⑧⑨⑩'):
-                        # 包含中文圈号数字（如③④①②ightarrow尝试提取第一个）
-                        try:
-                            answer_index = self._convert_chinese_number(answer_str) - 1
-                        except ValueError:
-                            # 如果是多个中文数字，尝试只取第一个字符
-                            if len(answer_str) > 0 and answer_str[0] in '①②③④⑤⑥⑦⑧⑨⑩':
-                                answer_index = self._convert_chinese_number(answer_str[0]) - 1
-                    
-                    elif len(answer_str) >= 1 and answer_str[0].upper() in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-                        # 以字母开头（A, B, C...）
-                        answer_index = ord(answer_str[0].upper()) - ord('A')
-                    
-                except ValueError as ve:
-                    log.debug(f"数字解析失败，尝试文本匹配: {answer_str}")
-            
-            # 如果无法解析为索引，尝试通过文本匹配选项
-            if answer_index is None and answer_str:
-                log.debug(f"尝试通过文本匹配选项: {answer_str[:50]}")
-                answer_index = await self._find_option_by_text(page, input_name, answer_str)
+            # 如果无法解析为索引，尝试通过文本匹配选项（整数答案无需转换为字符串）
+            if answer_index is None:
+                answer_str = str(answer).strip() if answer is not None else ""
+                if answer_str:
+                    log.debug(f"尝试通过文本匹配选项: {answer_str[:50]}")
+                    answer_index = await self._find_option_by_text(page, input_name, answer_str, option_labels)
             
             # 如果找到了索引，点击对应的选项
             if answer_index is not None:
                 # 转换为问卷星的value（索引0 -> value 1）
                 value = str(answer_index + 1)
-                radio_input = page.locator(f"input[type='radio'][name='{input_name}'][value='{value}']")
-                
-                if await radio_input.count() > 0:
-                    # 问卷星的radio input是隐藏的，需要点击外层的可见元素
-                    # 找到外层的 ui-radio 容器或 label
-                    parent = radio_input.locator("xpath=ancestor::div[contains(@class, 'ui-radio')]").first
-                    
-                    if await parent.count() > 0:
-                        # 点击外层容器（可见的）
-                        try:
-                            await parent.click(timeout=3000)
-                            
-                            # 获取选项文本用于日志
-                            option_text = ""
-                            try:
-                                label = parent.locator("div.label, .label").first
-                                if await label.count() > 0:
-                                    option_text = await label.inner_text()
-                            except:
-                                pass
-                            
-                            log.info(f"✓ 已选择单选项: {input_name} -> 选项{value} {option_text[:50]}")
-                        except Exception as click_err:
-                            # 如果点击容器失败，尝试点击label
-                            try:
-                                label = parent.locator("div.label, .label").first
-                                if await label.count() > 0:
-                                    await label.click(timeout=3000)
-                                    log.info(f"✓ 已选择单选项(通过label): {input_name} -> 选项{value}")
-                                else:
-                                    raise click_err
-                            except:
-                                log.error(f"点击选项失败: {input_name} value={value}, 错误: {click_err}")
-                    else:
-                        # 如果找不到父容器，尝试强制点击input（最后的备选方案）
-                        await radio_input.first.click(force=True, timeout=3000)
-                        log.info(f"✓ 已选择单选项(强制): {input_name} -> 选项{value}")
-                else:
+                # 问卷星的radio input是隐藏的，在页面内一次点击外层的 ui-radio 容器
+                if await page.evaluate(_CLICK_OPTIONS_JS, ["radio", input_name, [value]]):
                     log.warning(f"❌ 未找到单选项: {input_name} value={value}")
+                else:
+                    log.info(f"✓ 已选择单选项: {input_name} -> 选项{value} {_option_text(option_labels, answer_index)[:50]}")
             else:
                 log.warning(f"无法解析答案: {answer_str[:50]}")
         except Exception as e:
             log.error(f"填写单选题失败: {e}")
     
-    async def _fill_checkbox(self, page: Page, input_name: str, answers: Any):
+    async def _fill_checkbox(self, page: Page, input_name: str, answers: Any, option_labels: Optional[List[str]] = None):
         """填写多选题"""
         try:
             if not isinstance(answers, list):
                 answers = [answers]
-            
+
+            # 先在Python中解析全部答案（问卷星多选的value也是从1开始），再在页面内一次点选所有选项
+            values = []
             for answer in answers:
-                answer_index = None
-                
-                if isinstance(answer, int):
-                    answer_index = answer
-                elif isinstance(answer, str):
-                    answer_str = answer.strip()
-                    
-                    # 尝试多种格式解析
-                    try:
-                        if '|' in answer_str:
-                            # 格式："索引|内容"，提取索引部分
-                            parts = answer_str.split('|', 1)
-                            index_part = parts[0].strip()
-                            
-                            # 尝试解析索引部分
-                            if index_part.isdigit():
-                                answer_index = int(index_part)
-                            elif any(c in index_part for c in '①②③④⑤⑥⑦⑧⑨⑩'):
-                                # 包含中文圈号数字
-                                answer_index = self._convert_chinese_number(index_part) - 1
-                            else:
-                                # 尝试提取前导字母（A, B, C, D...）
-                                if len(index_part) >= 1 and index_part[0].upper() in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-                                    answer_index = ord(index_part[0].upper()) - ord('A')
-                        
-                        elif answer_str.isdigit():
-                            # 纯数字字符串
-                            answer_index = int(answer_str)
-                        
-                        elif any(c in answer_str for c in '①②③④⑤⑥⑦⑧⑨⑩'):
-                            # 包含中文圈号数字
-                            answer_index = self._convert_chinese_number(answer_str) - 1
-                        
-                        elif len(answer_str) >= 1 and answer_str[0].upper() in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-                            # 以字母开头（A, B, C, D...）
-                            answer_index = ord(answer_str[0].upper()) - ord('A')
-                        
-                    except ValueError as ve:
-                        log.warning(f"解析答案索引失败: {answer_str}, 错误: {ve}")
-                
+                answer_index = self._parse_answer_index(answer)
                 if answer_index is not None:
-                    # 问卷星多选的value也是从1开始
-                    value = str(answer_index + 1)
-                    checkbox_input = page.locator(f"input[type='checkbox'][name='{input_name}'][value='{value}']")
-                    
-                    if await checkbox_input.count() > 0:
-                        # 问卷星的checkbox input也是隐藏的，需要点击外层元素
-                        parent = checkbox_input.locator("xpath=ancestor::div[contains(@class, 'ui-checkbox')]").first
-                        
-                        if await parent.count() > 0:
-                            try:
-                                await parent.click(timeout=3000)
-                                
-                                # 获取选项文本
-                                option_text = ""
-                                try:
-                                    label = parent.locator("div.label, .label").first
-                                    if await label.count() > 0:
-                                        option_text = await label.inner_text()
-                                except:
-                                    pass
-                                
-                                log.info(f"✓ 已选择多选项: {input_name} -> 选项{value} {option_text[:50]}")
-                            except Exception as click_err:
-                                log.error(f"点击多选项失败: {input_name} value={value}, 错误: {click_err}")
-                        else:
-                            # 备选方案：强制点击checkbox
-                            await checkbox_input.first.check(force=True, timeout=3000)
-                            log.info(f"✓ 已选择多选项(强制): {input_name} -> 选项{value}")
-                    else:
-                        log.warning(f"❌ 未找到多选项: {input_name} value={value}")
+                    values.append(str(answer_index + 1))
                 else:
                     log.warning(f"无法解析答案 (类型: {type(answer).__name__}): {repr(answer)[:100]}")
+            if not values:
+                return
+
+            missing = set(await page.evaluate(_CLICK_OPTIONS_JS, ["checkbox", input_name, values]))
+            for value in values:
+                if value in missing:
+                    log.warning(f"❌ 未找到多选项: {input_name} value={value}")
+                else:
+                    log.info(f"✓ 已选择多选项: {input_name} -> 选项{value} {_option_text(option_labels, int(value) - 1)}")
         except Exception as e:
             log.error(f"填写多选题失败: {e}")
     
     async def _fill_text(self, page: Page, input_name: str, answer: str):
         """填写填空题"""
         try:
-            text_input = page.locator(f"input[name='{input_name}'][type='text'], textarea[name='{input_name}']").first
-            if await text_input.count() > 0:
+            # query_selector 只解析一次选择器，不存在时返回 None
+            text_input = await page.query_selector(f"input[name='{input_name}'][type='text'], textarea[name='{input_name}']")
+            if text_input:
                 await text_input.fill(str(answer), timeout=5000)
                 log.info(f"✓ 已填写文本: {input_name} = \"{answer[:80]}{'...' if len(str(answer)) > 80 else ''}\"")
             else:
@@ -952,36 +1137,27 @@ class WenjuanxingPlatform(BasePlatform):
         except Exception as e:
             log.error(f"填写填空题失败: {e}")
     
-    async def _extract_error_message(self, page: Page) -> str:
-        """提取错误提示信息"""
-        try:
-            error_elem = page.locator(".error-message, .alert-danger, .tip-error, .error-tip")
-            if await error_elem.count() > 0:
-                return await error_elem.first.inner_text()
-        except:
-            pass
-        return ""
-    
-    async def _check_success_message(self, page: Page) -> str:
-        """检查成功提示信息"""
+    async def _check_submit_feedback(self, page: Page) -> Dict[str, Any]:
+        """
+        检查提交后的页面反馈（在页面内一次完成，不序列化整页HTML）
+
+        Returns:
+            {"error": 错误提示, "success": 成功提示, "guessed": 页面文本是否包含成功相关关键词}
+        """
         try:
-            success_elem = page.locator(".success-message, .alert-success, .tip-success, .success-tip")
-            if await success_elem.count() > 0:
-                return await success_elem.first.inner_text()
-
-            # 检查页面标题是否包含"成功"、"完成"等字样
-            page_text = await page.content()
-            if any(kw in page_text for kw in ["提交成功", "已完成", "感谢您的参与"]):
-                return "提交成功"
-        except:
-            pass
-        return ""
+            return await page.evaluate(
+                _SUBMIT_FEEDBACK_JS,
+                [_ERROR_TIP_SELECTOR, _SUCCESS_TIP_SELECTOR, _SUCCESS_CONFIRM_KEYWORDS, _SUCCESS_GUESS_KEYWORDS],
+            )
+        except Exception as e:
+            log.debug(f"检查提交反馈失败: {e}")
+            return {}
 
     async def _fill_essay(self, page: Page, input_name: str, answer: str):
         """填写简答题"""
         try:
-            textarea = page.locator(f"textarea[name='{input_name}']").first
-            if await textarea.count() > 0:
+            textarea = await page.query_selector(f"textarea[name='{input_name}']")
+            if textarea:
                 await textarea.fill(str(answer), timeout=5000)
                 log.info(f"✓ 已填写简答题: {input_name} = \"{answer[:80]}{'...' if len(str(answer)) > 80 else ''}\"")
             else:
@@ -997,21 +1173,41 @@ class WenjuanxingPlatform(BasePlatform):
                 log.warning(f"矩阵填空题答案格式错误，应为字典: {type(answer).__name__}")
                 return
 
-            filled_count = 0
+            # sub_name 可能是 "q2_0", "q2_1" 等，所有子项在页面内一次填写
+            missing = await self._fill_text_fields(page, [
+                (sub_name, f"textarea[name='{sub_name}'], input[name='{sub_name}']", sub_answer)
+                for sub_name, sub_answer in answer.items()
+            ])
+
             for sub_name, sub_answer in answer.items():
-                # sub_name 可能是 "q2_0", "q2_1" 等
-                textarea = page.locator(f"textarea[name='{sub_name}'], input[name='{sub_name}']").first
-                if await textarea.count() > 0:
-                    await textarea.fill(str(sub_answer), timeout=5000)
-                    filled_count += 1
-                    log.info(f"✓ 已填写矩阵子项: {sub_name} = \"{str(sub_answer)[:50]}\"")
-                else:
+                if sub_name in missing:
                     log.warning(f"❌ 未找到矩阵子项输入框: {sub_name}")
+                else:
+                    log.info(f"✓ 已填写矩阵子项: {sub_name} = \"{str(sub_answer)[:50]}\"")
 
-            log.info(f"✓ 矩阵填空题 {input_name} 共填写 {filled_count} 个子项")
+            log.info(f"✓ 矩阵填空题 {input_name} 共填写 {len(answer) - len(missing)} 个子项")
         except Exception as e:
             log.error(f"填写矩阵填空题失败: {e}")
 
+    async def _fill_text_fields(self, page: Page, entries: List[Tuple[str, str, Any]]) -> Set[str]:
+        """
+        在页面内一次填写多个文本输入框
+
+        Args:
+            page: 页面对象
+            entries: [(子项name, 输入框选择器, 答案), ...]
+
+        Returns:
+            未找到输入框的子项name集合
+        """
+        if not entries:
+            return set()
+        missing = await page.evaluate(
+            _FILL_TEXT_FIELDS_JS,
+            [[name, selector, str(value)] for name, selector, value in entries],
+        )
+        return set(missing)
+
     async def _fill_multiple_essay(self, page: Page, input_name: str, answer: Any):
         """填写多项简答题"""
         try:
@@ -1037,29 +1233,33 @@ class WenjuanxingPlatform(BasePlatform):
             # 问卷星的下拉框value从1开始（0通常是"请选择"）
             value = str(answer_index + 1)
 
-            # 使用 select2 插件的选择方法
-            select = page.locator(f"select[name='{input_name}']").first
-            if await select.count() > 0:
-                # 检查是否使用了 select2 插件
-                select2_container = page.locator(f"select[name='{input_name}'] + .select2").first
-                if await select2_container.count() > 0:
-                    # 使用 select2 的方式选择
-                    # 点击 select2 容器打开下拉框
-                    await select2_container.click(timeout=3000)
-                    await page.wait_for_timeout(300)
-                    # 选择对应的选项
-                    option = page.locator(f".select2-results__option[data-select2-id]").nth(answer_index)
-                    if await option.count() > 0:
-                        await option.click(timeout=3000)
-                        log.info(f"✓ 已选择下拉选项(select2): {input_name} -> 选项{value}")
-                    else:
-                        # 备选方案：直接设置select的value
-                        await select.select_option(value, timeout=3000)
-                        log.info(f"✓ 已选择下拉选项(fallback): {input_name} -> 选项{value}")
+            # 一次 evaluate 判断下拉框类型，原生 select 直接在页面内完成选择
+            mode = await page.evaluate(_SELECT_DROPDOWN_JS, [input_name, value])
+            if mode == "native":
+                log.info(f"✓ 已选择下拉选项: {input_name} -> 选项{value}")
+            elif mode == "select2":
+                # 使用 select2 的方式选择
+                # 点击 select2 容器打开下拉框
+                select = page.locator(f"select[name='{input_name}']").first
+                await page.locator(f"select[name='{input_name}'] + .select2").first.click(timeout=3000)
+                # 等待选项列表出现（而不是固定等待）
+                try:
+                    await page.wait_for_selector(
+                        ".select2-results__options .select2-results__option", state="visible", timeout=2000
+                    )
+                except PlaywrightTimeout:
+                    log.debug(f"select2 选项列表未出现: {input_name}")
+                # 选择对应的选项
+                option = page.locator(f".select2-results__option[data-select2-id]").nth(answer_index)
+                if await option.count() > 0:
+                    await option.click(timeout=3000)
+                    log.info(f"✓ 已选择下拉选项(select2): {input_name} -> 选项{value}")
                 else:
-                    # 原生 select
+                    # 备选方案：直接设置select的value
                     await select.select_option(value, timeout=3000)
-                    log.info(f"✓ 已选择下拉选项: {input_name} -> 选项{value}")
+                    log.info(f"✓ 已选择下拉选项(fallback): {input_name} -> 选项{value}")
+            elif mode == "no_option":
+                log.warning(f"❌ 未找到下拉选项: {input_name} -> 选项{value}")
             else:
                 log.warning(f"❌ 未找到下拉选择框: {input_name}")
         except Exception as e:
@@ -1069,46 +1269,44 @@ class WenjuanxingPlatform(BasePlatform):
         """填写多项填空题（段落中嵌入的多个填空）"""
         try:
             # 答案可以是字典 {"q10_1": "答案1", "q10_2": "答案2"}
-            # 或列表 ["答案1", "答案2"]
+            # 或列表 ["答案1", "答案2"]；统一为 (子项name, 第几空, 答案)
             if isinstance(answer, dict):
-                for sub_name, sub_answer in answer.items():
-                    # 尝试找到对应的输入框
-                    text_input = page.locator(f"input[name='{sub_name}']").first
-                    if await text_input.count() > 0:
-                        await text_input.fill(str(sub_answer), timeout=5000)
-                        log.info(f"✓ 已填写多项填空子项: {sub_name} = \"{str(sub_answer)[:50]}\"")
-                    else:
-                        # 尝试 contenteditable 元素
-                        label = page.locator(f"label.textEdit").nth(int(sub_name.split('_')[-1]) - 1)
-                        if await label.count() > 0:
-                            span = label.locator("span.textCont").first
-                            if await span.count() > 0:
-                                await span.click(timeout=3000)
-                                await span.fill(str(sub_answer), timeout=5000)
-                                log.info(f"✓ 已填写多项填空(contenteditable): {sub_name} = \"{str(sub_answer)[:50]}\"")
-                        else:
-                            log.warning(f"❌ 未找到多项填空子项: {sub_name}")
-
+                items = [
+                    (sub_name, _gap_position(sub_name), sub_answer)
+                    for sub_name, sub_answer in answer.items()
+                ]
             elif isinstance(answer, list):
-                for idx, sub_answer in enumerate(answer, start=1):
-                    sub_name = f"{input_name}_{idx}"
-                    text_input = page.locator(f"input[name='{sub_name}']").first
-                    if await text_input.count() > 0:
-                        await text_input.fill(str(sub_answer), timeout=5000)
-                        log.info(f"✓ 已填写多项填空第{idx}空: \"{str(sub_answer)[:50]}\"")
-                    else:
-                        # 尝试 contenteditable
-                        label = page.locator(f"label.textEdit").nth(idx - 1)
-                        if await label.count() > 0:
-                            span = label.locator("span.textCont").first
-                            if await span.count() > 0:
-                                await span.click(timeout=3000)
-                                await span.fill(str(sub_answer), timeout=5000)
-                                log.info(f"✓ 已填写多项填空(contenteditable)第{idx}空: \"{str(sub_answer)[:50]}\"")
-                        else:
-                            log.warning(f"❌ 未找到多项填空第{idx}空")
+                items = [
+                    (f"{input_name}_{position}", position, sub_answer)
+                    for position, sub_answer in enumerate(answer, start=1)
+                ]
             else:
                 log.warning(f"多项填空题答案格式错误: {type(answer).__name__}")
+                return
+
+            # 普通输入框在页面内一次填写，找不到的再逐个尝试 contenteditable 元素
+            missing = await self._fill_text_fields(
+                page, [(sub_name, f"input[name='{sub_name}']", sub_answer) for sub_name, _, sub_answer in items]
+            )
+
+            for sub_name, position, sub_answer in items:
+                if sub_name not in missing:
+                    log.info(f"✓ 已填写多项填空子项: {sub_name} = \"{str(sub_answer)[:50]}\"")
+                    continue
+
+                # 尝试 contenteditable 元素（按第几空定位）
+                if position is None:
+                    log.warning(f"❌ 未找到多项填空子项: {sub_name}")
+                    continue
+                label = page.locator(f"label.textEdit").nth(position - 1)
+                if await label.count() > 0:
+                    span = label.locator("span.textCont").first
+                    if await span.count() > 0:
+                        await span.click(timeout=3000)
+                        await span.fill(str(sub_answer), timeout=5000)
+                        log.info(f"✓ 已填写多项填空(contenteditable): {sub_name} = \"{str(sub_answer)[:50]}\"")
+                else:
+                    log.warning(f"❌ 未找到多项填空子项: {sub_name}")
 
         except Exception as e:
             log.error(f"填写多项填空题失败: {e}")
@@ -1122,7 +1320,11 @@ class WenjuanxingPlatform(BasePlatform):
             if await cascade_input.count() > 0:
                 # 点击输入框打开级联选择器
                 await cascade_input.click(timeout=3000)
-                await page.wait_for_timeout(500)
+                # 等待级联选择器弹出，最多等待原来的固定时长
+                try:
+                    await page.wait_for_selector(_CASCADE_PICKER_SELECTOR, state="visible", timeout=500)
+                except PlaywrightTimeout:
+                    log.debug(f"级联选择器未弹出: {input_name}")
 
                 # 级联下拉的选择逻辑比较复杂，这里只做简单处理
                 # 将答案直接填入输入框（某些情况下可能有效）
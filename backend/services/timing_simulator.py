@@ -2,11 +2,18 @@
 import asyncio
 import random
 from enum import Enum
+from statistics import NormalDist
 from typing import Optional, List
-import numpy as np
 from backend.core.logger import log
 
 
+# 标准正态分布（截断正态采样用其 CDF / 逆CDF）
+_STANDARD_NORMAL = NormalDist()
+
+# 逆CDF的概率参数需在开区间(0, 1)内
+_MIN_PROBABILITY = 1e-12
+
+
 class TimingStrategy(str, Enum):
     """时间策略"""
     NONE = "无停顿"
@@ -18,6 +25,13 @@ class TimingStrategy(str, Enum):
 class TimingSimulator:
     """时间模拟器"""
     
+    # 难度 -> 思考时间范围（秒）
+    _DIFFICULTY_MAP = {
+        "easy": (1.0, 3.0),
+        "medium": (2.0, 6.0),
+        "hard": (4.0, 10.0),
+    }
+    
     def __init__(
         self,
         strategy: TimingStrategy = TimingStrategy.NORMAL,
@@ -47,6 +61,12 @@ class TimingSimulator:
         self.std_time = std_time or (max_time - min_time) / 6
         self.pause_probability = pause_probability
         self.pause_duration = pause_duration
+        # 截断正态分布：[min_time, max_time] 对应的标准正态累积概率区间
+        if self.std_time > 0:
+            self._cdf_low = _STANDARD_NORMAL.cdf((min_time - self.mean_time) / self.std_time)
+            self._cdf_high = _STANDARD_NORMAL.cdf((max_time - self.mean_time) / self.std_time)
+        else:
+            self._cdf_low = self._cdf_high = 0.0
     
     async def wait_before_answer(self, question_index: int, total_questions: int):
         """
@@ -87,9 +107,14 @@ class TimingSimulator:
         return random.uniform(self.min_time, self.max_time)
     
     def _normal_time(self) -> float:
-        """正态分布时间"""
-        time = np.random.normal(self.mean_time, self.std_time)
-        # 限制在min和max之间
+        """正态分布时间（截断到min和max之间，逆CDF采样，边界处不会堆积概率）"""
+        if self._cdf_high <= self._cdf_low:
+            # 区间退化（标准差为0或区间远在分布尾部），取限制后的均值
+            return max(self.min_time, min(self.max_time, self.mean_time))
+        p = self._cdf_low + random.random() * (self._cdf_high - self._cdf_low)
+        p = min(max(p, _MIN_PROBABILITY), 1 - _MIN_PROBABILITY)
+        time = self.mean_time + self.std_time * _STANDARD_NORMAL.inv_cdf(p)
+        # 浮点误差兜底，仍限制在min和max之间
         return max(self.min_time, min(self.max_time, time))
     
     def _segmented_time(self, question_index: int, total_questions: int) -> float:
@@ -105,6 +130,36 @@ class TimingSimulator:
         
         return base_time
     
+    async def wait_full(
+        self,
+        question_index: int,
+        total_questions: int,
+        content_length: int = 0,
+        text: str = "",
+        difficulty: Optional[str] = None,
+    ):
+        """
+        在答题前一次性等待：答题间隔、阅读、思考、打字时间合并为一次 sleep（NONE 策略不等待）
+        
+        Args:
+            question_index: 题目索引（从0开始）
+            total_questions: 题目总数
+            content_length: 题目内容长度（字符数），为0时不计阅读时间
+            text: 要输入的文本，为空时不计打字时间
+            difficulty: 难度（easy/medium/hard），为None时不计思考时间
+        """
+        if self.strategy == TimingStrategy.NONE:
+            return
+        wait_time = self.calculate_wait_time(question_index, total_questions)
+        if content_length > 0:
+            wait_time += self._reading_time(content_length)
+        if difficulty is not None:
+            wait_time += self._thinking_time(difficulty)
+        if text:
+            wait_time += self._typing_time(text)
+        log.debug(f"等待 {wait_time:.2f} 秒后回答第 {question_index + 1} 题")
+        await asyncio.sleep(wait_time)
+    
     async def simulate_reading_time(self, content_length: int) -> float:
         """
         根据内容长度模拟阅读时间
@@ -115,15 +170,7 @@ class TimingSimulator:
         Returns:
             阅读时间（秒）
         """
-        # 假设阅读速度：每分钟300字（中文），每秒5字
-        reading_speed = 5  # 字/秒
-        base_time = content_length / reading_speed
-        
-        # 添加随机波动（±30%）
-        variation = base_time * random.uniform(-0.3, 0.3)
-        total_time = max(1.0, base_time + variation)
-        
-        return total_time
+        return self._reading_time(content_length)
     
     async def simulate_typing_time(self, text: str) -> float:
         """
@@ -135,15 +182,7 @@ class TimingSimulator:
         Returns:
             打字时间（秒）
         """
-        # 假设打字速度：每分钟60字（中文），每秒1字
-        typing_speed = 1  # 字/秒
-        base_time = len(text) / typing_speed
-        
-        # 添加随机波动
-        variation = base_time * random.uniform(-0.2, 0.4)
-        total_time = max(0.5, base_time + variation)
-        
-        return total_time
+        return self._typing_time(text)
     
     async def simulate_thinking_time(self, difficulty: str = "medium") -> float:
         """
@@ -155,13 +194,31 @@ class TimingSimulator:
         Returns:
             思考时间（秒）
         """
-        difficulty_map = {
-            "easy": (1.0, 3.0),
-            "medium": (2.0, 6.0),
-            "hard": (4.0, 10.0),
-        }
+        return self._thinking_time(difficulty)
+    
+    def _reading_time(self, content_length: int) -> float:
+        """阅读时间"""
+        # 假设阅读速度：每分钟300字（中文），每秒5字
+        reading_speed = 5  # 字/秒
+        base_time = content_length / reading_speed
         
-        min_t, max_t = difficulty_map.get(difficulty, (2.0, 6.0))
+        # 添加随机波动（±30%）
+        variation = base_time * random.uniform(-0.3, 0.3)
+        return max(1.0, base_time + variation)
+    
+    def _typing_time(self, text: str) -> float:
+        """打字时间"""
+        # 假设打字速度：每分钟60字（中文），每秒1字
+        typing_speed = 1  # 字/秒
+        base_time = len(text) / typing_speed
+        
+        # 添加随机波动
+        variation = base_time * random.uniform(-0.2, 0.4)
+        return max(0.5, base_time + variation)
+    
+    def _thinking_time(self, difficulty: str) -> float:
+        """思考时间"""
+        min_t, max_t = self._DIFFICULTY_MAP.get(difficulty, self._DIFFICULTY_MAP["medium"])
         return random.uniform(min_t, max_t)
 
 
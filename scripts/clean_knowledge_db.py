@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """清理知识库数据库脏数据"""
 import asyncio
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func
 from backend.core.database import async_session_maker
 from backend.models.schema import KnowledgeDocument, KnowledgeChunk, VectorEmbedding
 from backend.core.logger import log
@@ -14,66 +14,42 @@ async def clean_database():
     print("=" * 60)
     
     async with async_session_maker() as session:
-        # 1. 查找并删除孤儿分块（document_id对应的文档不存在）
+        # 1. 删除孤儿分块（document_id对应的文档不存在），一条反连接语句完成
         print("\n1. 检查孤儿分块...")
         result = await session.execute(
-            select(KnowledgeChunk)
+            delete(KnowledgeChunk)
+            .where(~KnowledgeChunk.document_id.in_(select(KnowledgeDocument.id)))
+            .execution_options(synchronize_session=False)
         )
-        all_chunks = result.scalars().all()
-        
-        orphan_chunks = []
-        for chunk in all_chunks:
-            doc_result = await session.execute(
-                select(KnowledgeDocument).where(KnowledgeDocument.id == chunk.document_id)
-            )
-            doc = doc_result.scalar_one_or_none()
-            if not doc:
-                orphan_chunks.append(chunk)
-        
-        if orphan_chunks:
-            print(f"  发现 {len(orphan_chunks)} 个孤儿分块")
-            for chunk in orphan_chunks:
-                await session.delete(chunk)
-            print(f"  ✓ 已删除孤儿分块")
+        if result.rowcount:
+            print(f"  ✓ 已删除 {result.rowcount} 个孤儿分块")
         else:
             print("  ✓ 没有孤儿分块")
         
-        # 2. 查找并删除孤儿向量（chunk_id对应的分块不存在）
+        # 2. 删除孤儿向量（chunk_id对应的分块不存在，包括上一步删除的分块）
         print("\n2. 检查孤儿向量...")
         result = await session.execute(
-            select(VectorEmbedding)
+            delete(VectorEmbedding)
+            .where(~VectorEmbedding.chunk_id.in_(select(KnowledgeChunk.id)))
+            .execution_options(synchronize_session=False)
         )
-        all_vectors = result.scalars().all()
-        
-        orphan_vectors = []
-        for vector in all_vectors:
-            chunk_result = await session.execute(
-                select(KnowledgeChunk).where(KnowledgeChunk.id == vector.chunk_id)
-            )
-            chunk = chunk_result.scalar_one_or_none()
-            if not chunk:
-                orphan_vectors.append(vector)
-        
-        if orphan_vectors:
-            print(f"  发现 {len(orphan_vectors)} 个孤儿向量")
-            for vector in orphan_vectors:
-                await session.delete(vector)
-            print(f"  ✓ 已删除孤儿向量")
+        if result.rowcount:
+            print(f"  ✓ 已删除 {result.rowcount} 个孤儿向量")
         else:
             print("  ✓ 没有孤儿向量")
         
-        # 3. 统计当前状态
+        # 3. 统计当前状态（一次分组查询得到各文档的分块数）
         print("\n3. 当前数据库状态:")
-        doc_result = await session.execute(select(KnowledgeDocument))
-        docs = doc_result.scalars().all()
-        print(f"  文档数量: {len(docs)}")
+        result = await session.execute(
+            select(KnowledgeDocument.title, func.count(KnowledgeChunk.id))
+            .outerjoin(KnowledgeChunk, KnowledgeChunk.document_id == KnowledgeDocument.id)
+            .group_by(KnowledgeDocument.id, KnowledgeDocument.title)
+        )
+        doc_stats = result.all()
+        print(f"  文档数量: {len(doc_stats)}")
         
-        for doc in docs:
-            chunk_result = await session.execute(
-                select(KnowledgeChunk).where(KnowledgeChunk.document_id == doc.id)
-            )
-            chunks = chunk_result.scalars().all()
-            print(f"    - {doc.title}: {len(chunks)} 个分块")
+        for title, chunk_count in doc_stats:
+            print(f"    - {title}: {chunk_count} 个分块")
         
         # 提交更改
         await session.commit()
@@ -8,6 +8,9 @@ def clear_questionnaire_cache(url):
 
     try:
         conn = sqlite3.connect(db_path)
+        # 仅对本连接生效的设置：减少提交时的 fsync，临时数据放内存
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
         cursor = conn.cursor()
 
         # 查找问卷ID
@@ -21,24 +24,27 @@ def clear_questionnaire_cache(url):
         for qid, title in results:
             print(f"\n📝 找到问卷: ID={qid}, 标题='{title}'")
 
-            # 删除题目记录
-            cursor.execute("DELETE FROM questions WHERE questionnaire_id = ?", (qid,))
-            deleted_questions = cursor.rowcount
-            print(f"   删除题目: {deleted_questions} 条")
+        # 一次性删除所有匹配问卷的关联记录（子查询选出问卷ID，每张表只扫描一遍）；
+        # sqlite3 在第一条 DELETE 前隐式开启事务，最后统一提交
+        matched_ids = "SELECT id FROM questionnaires WHERE url LIKE ?"
+        pattern = (f"%{url}%",)
+        print()
 
-            # 删除答题会话
-            cursor.execute("DELETE FROM answering_sessions WHERE questionnaire_id = ?", (qid,))
-            deleted_sessions = cursor.rowcount
-            print(f"   删除会话: {deleted_sessions} 条")
+        # 删除题目记录
+        cursor.execute(f"DELETE FROM questions WHERE questionnaire_id IN ({matched_ids})", pattern)
+        print(f"   删除题目: {cursor.rowcount} 条")
 
-            # 删除答案记录
-            cursor.execute("DELETE FROM answers WHERE questionnaire_id = ?", (qid,))
-            deleted_answers = cursor.rowcount
-            print(f"   删除答案: {deleted_answers} 条")
+        # 删除答题会话
+        cursor.execute(f"DELETE FROM answering_sessions WHERE questionnaire_id IN ({matched_ids})", pattern)
+        print(f"   删除会话: {cursor.rowcount} 条")
 
-            # 删除问卷
-            cursor.execute("DELETE FROM questionnaires WHERE id = ?", (qid,))
-            print(f"   删除问卷: 1 条")
+        # 删除答案记录
+        cursor.execute(f"DELETE FROM answers WHERE questionnaire_id IN ({matched_ids})", pattern)
+        print(f"   删除答案: {cursor.rowcount} 条")
+
+        # 删除问卷
+        cursor.execute("DELETE FROM questionnaires WHERE url LIKE ?", pattern)
+        print(f"   删除问卷: {cursor.rowcount} 条")
 
         conn.commit()
         print(f"\n✅ 缓存清除成功！现在可以重新解析问卷了。")
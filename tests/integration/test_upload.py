@@ -4,12 +4,70 @@
 import asyncio
 import httpx
 import os
+from typing import List
 
 BASE_URL = "http://localhost:8000"
 
 # 获取 fixtures 目录路径
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
 
+UPLOAD_URL = f"{BASE_URL}/api/knowledge/documents/upload"
+
+
+async def _check_upload(client: httpx.AsyncClient, title: str, filename: str, content_type: str) -> List[str]:
+    """上传 fixtures 中的文件，返回输出行"""
+    lines = [title]
+    try:
+        file_path = os.path.join(FIXTURES_DIR, filename)
+        with open(file_path, 'rb') as f:
+            files = {'file': (filename, f, content_type)}
+            response = await client.post(UPLOAD_URL, files=files, timeout=30.0)
+
+        if response.status_code == 200:
+            data = response.json()
+            lines.append(f"   ✓ 上传成功！文档 ID: {data['id']}, 分块数: {data['total_chunks']}")
+        else:
+            lines.append(f"   ✗ 上传失败: {response.status_code}")
+            lines.append(f"   错误信息: {response.json()}")
+    except Exception as e:
+        lines.append(f"   ✗ 请求失败: {e}")
+    return lines
+
+
+async def _check_rejected(client: httpx.AsyncClient, title: str, files: dict, reason: str) -> List[str]:
+    """上传应被拒绝的文件（期望 400），返回输出行"""
+    lines = [title]
+    try:
+        response = await client.post(UPLOAD_URL, files=files, timeout=30.0)
+
+        if response.status_code == 400:
+            lines.append(f"   ✓ 正确拒绝了{reason}")
+            lines.append(f"   错误信息: {response.json()['detail']}")
+        else:
+            lines.append(f"   ✗ 应该返回 400 错误，实际: {response.status_code}")
+    except Exception as e:
+        lines.append(f"   ✗ 请求失败: {e}")
+    return lines
+
+
+async def _check_document_list(client: httpx.AsyncClient) -> List[str]:
+    """获取文档列表，返回输出行"""
+    lines = ["\n5. 测试获取文档列表..."]
+    try:
+        response = await client.get(f"{BASE_URL}/api/knowledge/documents")
+
+        if response.status_code == 200:
+            documents = response.json()
+            lines.append(f"   ✓ 获取成功！共 {len(documents)} 个文档")
+            for doc in documents[:3]:  # 显示前 3 个
+                lines.append(f"      - {doc['title']} ({doc['total_chunks']} 分块)")
+        else:
+            lines.append(f"   ✗ 获取失败: {response.status_code}")
+    except Exception as e:
+        lines.append(f"   ✗ 请求失败: {e}")
+    return lines
+
+
 async def test_file_validation():
     """测试文件验证功能"""
     print("=" * 60)
@@ -17,101 +75,28 @@ async def test_file_validation():
     print("=" * 60)
 
     async with httpx.AsyncClient() as client:
-        # 测试 1: 上传 markdown 文件
-        print("\n1. 测试上传 .md 文件...")
-        try:
-            md_file_path = os.path.join(FIXTURES_DIR, 'test_markdown.md')
-            with open(md_file_path, 'rb') as f:
-                files = {'file': ('test_markdown.md', f, 'text/markdown')}
-                response = await client.post(
-                    f"{BASE_URL}/api/knowledge/documents/upload",
-                    files=files,
-                    timeout=30.0
-                )
-
-            if response.status_code == 200:
-                data = response.json()
-                print(f"   ✓ 上传成功！文档 ID: {data['id']}, 分块数: {data['total_chunks']}")
-            else:
-                print(f"   ✗ 上传失败: {response.status_code}")
-                print(f"   错误信息: {response.json()}")
-        except Exception as e:
-            print(f"   ✗ 请求失败: {e}")
-
-        # 测试 2: 上传 txt 文件
-        print("\n2. 测试上传 .txt 文件...")
-        try:
-            txt_file_path = os.path.join(FIXTURES_DIR, 'test_text.txt')
-            with open(txt_file_path, 'rb') as f:
-                files = {'file': ('test_text.txt', f, 'text/plain')}
-                response = await client.post(
-                    f"{BASE_URL}/api/knowledge/documents/upload",
-                    files=files,
-                    timeout=30.0
-                )
-
-            if response.status_code == 200:
-                data = response.json()
-                print(f"   ✓ 上传成功！文档 ID: {data['id']}, 分块数: {data['total_chunks']}")
-            else:
-                print(f"   ✗ 上传失败: {response.status_code}")
-                print(f"   错误信息: {response.json()}")
-        except Exception as e:
-            print(f"   ✗ 请求失败: {e}")
-
-        # 测试 3: 尝试上传不支持的文件格式（创建一个临时 .pdf 文件名）
-        print("\n3. 测试上传不支持的文件格式 (.pdf)...")
-        try:
-            content = b"Fake PDF content"
-            files = {'file': ('test.pdf', content, 'application/pdf')}
-            response = await client.post(
-                f"{BASE_URL}/api/knowledge/documents/upload",
-                files=files,
-                timeout=30.0
-            )
-
-            if response.status_code == 400:
-                print(f"   ✓ 正确拒绝了不支持的格式")
-                print(f"   错误信息: {response.json()['detail']}")
-            else:
-                print(f"   ✗ 应该返回 400 错误，实际: {response.status_code}")
-        except Exception as e:
-            print(f"   ✗ 请求失败: {e}")
-
-        # 测试 4: 测试文件大小限制（创建一个超过 10MB 的文件）
-        print("\n4. 测试文件大小限制...")
-        try:
-            # 创建一个 11MB 的内容
-            large_content = "A" * (11 * 1024 * 1024)
-            files = {'file': ('large.txt', large_content.encode(), 'text/plain')}
-            response = await client.post(
-                f"{BASE_URL}/api/knowledge/documents/upload",
-                files=files,
-                timeout=30.0
-            )
-
-            if response.status_code == 400:
-                print(f"   ✓ 正确拒绝了超大文件")
-                print(f"   错误信息: {response.json()['detail']}")
-            else:
-                print(f"   ✗ 应该返回 400 错误，实际: {response.status_code}")
-        except Exception as e:
-            print(f"   ✗ 请求失败: {e}")
-
-        # 测试 5: 获取文档列表
-        print("\n5. 测试获取文档列表...")
-        try:
-            response = await client.get(f"{BASE_URL}/api/knowledge/documents")
-
-            if response.status_code == 200:
-                documents = response.json()
-                print(f"   ✓ 获取成功！共 {len(documents)} 个文档")
-                for doc in documents[:3]:  # 显示前 3 个
-                    print(f"      - {doc['title']} ({doc['total_chunks']} 分块)")
-            else:
-                print(f"   ✗ 获取失败: {response.status_code}")
-        except Exception as e:
-            print(f"   ✗ 请求失败: {e}")
+        # 测试 1-4 互不依赖，并发发送请求，完成后按顺序输出结果
+        results = await asyncio.gather(
+            # 测试 1: 上传 markdown 文件
+            _check_upload(client, "\n1. 测试上传 .md 文件...", 'test_markdown.md', 'text/markdown'),
+            # 测试 2: 上传 txt 文件
+            _check_upload(client, "\n2. 测试上传 .txt 文件...", 'test_text.txt', 'text/plain'),
+            # 测试 3: 尝试上传不支持的文件格式（创建一个临时 .pdf 文件名）
+            _check_rejected(
+                client, "\n3. 测试上传不支持的文件格式 (.pdf)...",
+                {'file': ('test.pdf', b"Fake PDF content", 'application/pdf')}, "不支持的格式",
+            ),
+            # 测试 4: 测试文件大小限制（创建一个 11MB 的内容）
+            _check_rejected(
+                client, "\n4. 测试文件大小限制...",
+                {'file': ('large.txt', b"A" * (11 * 1024 * 1024), 'text/plain')}, "超大文件",
+            ),
+        )
+        for lines in results:
+            print("\n".join(lines))
+
+        # 测试 5: 获取文档列表（在上传完成后进行，列表中才包含新文档）
+        print("\n".join(await _check_document_list(client)))
 
     print("\n" + "=" * 60)
     print("测试完成！")
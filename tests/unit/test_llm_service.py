@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""测试 LLM 服务的提示词构建（参考资料按令牌预算截断、JSON 模式说明）"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.models.question import Question, QuestionType
+from backend.services.llm_service import LLMService
+
+
+def _make_service(**kwargs) -> LLMService:
+    service = LLMService(api_key="test", **kwargs)
+    # 固定使用字符估算计数，结果不受是否安装 tiktoken 影响
+    service._encoding = False
+    return service
+
+
+def test_truncate_context_fits_budget():
+    """测试截断后的用户提示词不超过令牌预算，且保留参考资料开头"""
+    service = _make_service()
+    question = Question(id="div1", type=QuestionType.FILL_BLANK, content="光合作用的产物是什么？", order=1)
+    knowledge_context = "\n".join(f"第{i}段：植物通过光合作用产生氧气和葡萄糖。" for i in range(200))
+
+    for budget in (60, 200, 1000):
+        truncated = service._truncate_context(question, knowledge_context, budget)
+        assert knowledge_context.startswith(truncated)
+        assert service._count_tokens(service._build_user_prompt(question, truncated)) <= budget
+
+    # 预算连题目本身都放不下时，参考资料被截为空
+    assert service._truncate_context(question, knowledge_context, 5) == ""
+
+
+def test_build_messages_truncates_context():
+    """测试超出 max_input_tokens 时构建的消息在预算之内"""
+    service = _make_service(max_input_tokens=400)
+    question = Question(id="div1", type=QuestionType.FILL_BLANK, content="光合作用的产物是什么？", order=1)
+    knowledge_context = "植物通过光合作用产生氧气和葡萄糖。" * 200
+
+    messages = service._build_messages(question, knowledge_context, None)
+    assert sum(service._count_tokens(m["content"]) for m in messages) <= 400
+
+
+def test_json_mode_hint():
+    """测试 JSON 模式下自定义系统提示词会补充包含 json 字样的说明"""
+    question = Question(id="div1", type=QuestionType.FILL_BLANK, content="1+1=?", order=1)
+
+    messages = _make_service(json_mode=True)._build_messages(question, None, "你是答题助手")
+    assert "json" in messages[0]["content"].lower()
+
+    messages = _make_service()._build_messages(question, None, "你是答题助手")
+    assert messages[0]["content"] == "你是答题助手"
+
+
+if __name__ == "__main__":
+    test_truncate_context_fits_budget()
+    test_build_messages_truncates_context()
+    test_json_mode_hint()
+    print("✓ 所有测试通过")
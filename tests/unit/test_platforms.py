@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""测试问卷平台识别（按域名后缀匹配平台类型）"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.services.platforms import PlatformType, get_platform, _match_platform_type
+
+
+def test_match_platform_type():
+    """测试域名后缀匹配：子域名命中，相似域名和中间段不命中"""
+    assert _match_platform_type("wjx.cn") == PlatformType.WENJUANXING
+    assert _match_platform_type("sub.wjx.cn") == PlatformType.WENJUANXING
+    assert _match_platform_type("ks.wjx.top") == PlatformType.WENJUANXING
+    assert _match_platform_type("WWW.WJX.CN.") == PlatformType.WENJUANXING
+
+    assert _match_platform_type("evilwjx.cn") is None
+    assert _match_platform_type("wjx.cn.evil.com") is None
+    assert _match_platform_type("cn") is None
+    assert _match_platform_type("") is None
+
+
+def test_get_platform():
+    """测试按URL获取适配器：只看主机名，不看查询参数"""
+    assert get_platform("https://www.wjx.cn/vm/abc.aspx#top").platform_name == PlatformType.WENJUANXING
+    assert get_platform("www.wjx.cn/vm/abc.aspx").platform_name == PlatformType.WENJUANXING
+
+    for url in ("https://evil.com/?redirect=wjx.cn", "https://evilwjx.cn/vm/abc.aspx"):
+        try:
+            get_platform(url)
+        except ValueError:
+            continue
+        raise AssertionError(f"不应识别为支持的平台: {url}")
+
+
+if __name__ == "__main__":
+    test_match_platform_type()
+    test_get_platform()
+    print("✓ 所有测试通过")
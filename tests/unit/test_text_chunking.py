@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""测试知识库文本分块（字符级强制分割的分块偏移）"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.services.knowledge_base import KnowledgeBaseService
+
+
+def test_character_split_offsets():
+    """测试字符级分割：分块大小、相邻分块重叠、末尾覆盖"""
+    service = KnowledgeBaseService(embedding_service=None)
+    text = "".join(chr(ord("a") + i % 26) for i in range(100))
+
+    chunks = service._character_split(text, chunk_size=30, overlap=10)
+    # 起点间隔 30-10=20：0, 20, 40, 60, 80
+    assert chunks == [text[start:start + 30] for start in range(0, 100, 20)]
+    assert all(len(c) <= 30 for c in chunks)
+    for prev, cur in zip(chunks, chunks[1:]):
+        assert prev[-10:] == cur[:10]
+    assert chunks[-1].endswith(text[-1])
+
+    # 无重叠时恰好首尾相接
+    assert "".join(service._character_split(text, chunk_size=25, overlap=0)) == text
+
+
+def test_character_split_overlap_not_less_than_size():
+    """测试重叠不小于分块大小时退化为不重叠，不产生重复分块"""
+    service = KnowledgeBaseService(embedding_service=None)
+    text = "x" * 73
+
+    for overlap in (14, 16, 100):
+        chunks = service._character_split(text, chunk_size=14, overlap=overlap)
+        assert len(chunks) == 6
+        assert "".join(chunks) == text
+
+
+def test_character_split_strips_blank_chunks():
+    """测试空白分块被去除"""
+    service = KnowledgeBaseService(embedding_service=None)
+    assert service._character_split(" " * 50, chunk_size=10, overlap=2) == []
+    assert service._character_split("ab" + " " * 20, chunk_size=10, overlap=0) == ["ab"]
+
+
+if __name__ == "__main__":
+    test_character_split_offsets()
+    test_character_split_overlap_not_less_than_size()
+    test_character_split_strips_blank_chunks()
+    print("✓ 所有测试通过")
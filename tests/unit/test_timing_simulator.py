@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""测试答题时间模拟（截断正态分布采样、合并等待）"""
+
+import asyncio
+import sys
+import os
+import random
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.services.timing_simulator import TimingSimulator, TimingStrategy, TimingProfile
+
+
+def test_normal_time_within_bounds():
+    """测试正态分布采样的时间都在 [min_time, max_time] 内，且不在边界处堆积"""
+    random.seed(0)
+    simulator = TimingProfile.get_normal_profile()
+
+    samples = [simulator._normal_time() for _ in range(5000)]
+    assert all(simulator.min_time <= t <= simulator.max_time for t in samples)
+    # 截断正态分布在边界处概率为0（截断采样不会把尾部堆到边界上）
+    assert simulator.min_time not in samples
+    assert simulator.max_time not in samples
+    # 区间 [2, 10] 关于均值5不对称，截断后的均值略高于5
+    assert 5.0 < sum(samples) / len(samples) < 5.6
+
+
+def test_normal_time_degenerate():
+    """测试退化区间：标准差为0或区间远在分布尾部时返回限制后的均值"""
+    assert TimingSimulator(min_time=3.0, max_time=3.0)._normal_time() == 3.0
+    far_tail = TimingSimulator(min_time=100.0, max_time=200.0, mean_time=1.0, std_time=1.0)
+    assert far_tail._normal_time() == 100.0
+
+    # 均值在区间外但概率区间未退化时，采样仍在区间内
+    random.seed(1)
+    shifted = TimingSimulator(min_time=2.0, max_time=4.0, mean_time=0.0, std_time=1.0)
+    assert all(2.0 <= shifted._normal_time() <= 4.0 for _ in range(1000))
+
+
+def test_calculate_wait_time():
+    """测试各时间策略的等待时间"""
+    assert TimingSimulator(strategy=TimingStrategy.NONE).calculate_wait_time(0, 10) == 0.0
+    uniform = TimingProfile.get_fast_profile()
+    assert all(1.0 <= uniform.calculate_wait_time(i, 10) <= 3.0 for i in range(100))
+
+
+def test_wait_full_single_sleep():
+    """测试合并等待只 sleep 一次，且包含阅读和打字时间；NONE 策略不等待"""
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    original_sleep = asyncio.sleep
+    asyncio.sleep = fake_sleep
+    try:
+        asyncio.run(TimingSimulator(strategy=TimingStrategy.NONE).wait_full(0, 10, 500, "答案"))
+        assert sleeps == []
+
+        simulator = TimingSimulator(strategy=TimingStrategy.UNIFORM, min_time=2.0, max_time=2.0)
+        asyncio.run(simulator.wait_full(0, 10, content_length=50, text="光合作用"))
+    finally:
+        asyncio.sleep = original_sleep
+
+    # 间隔2秒 + 阅读约7~13秒 + 打字约3.2~5.6秒
+    assert len(sleeps) == 1 and 12.0 < sleeps[0] < 21.0
+
+
+if __name__ == "__main__":
+    test_normal_time_within_bounds()
+    test_normal_time_degenerate()
+    test_calculate_wait_time()
+    test_wait_full_single_sleep()
+    print("✓ 所有测试通过")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""测试问卷星适配器中的纯函数（答案预处理与解析）"""
+
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from backend.services.platforms.wenjuanxing import WenjuanxingPlatform
+
+
+def test_preprocess_answer():
+    """测试答案预处理：JSON数组、逗号分隔、格式错误的数组原样返回"""
+    platform = WenjuanxingPlatform()
+
+    assert platform._preprocess_answer(None) is None
+    assert platform._preprocess_answer("   ") is None
+    assert platform._preprocess_answer(2) == 2
+    assert platform._preprocess_answer(" [0, 2] ") == [0, 2]
+    assert platform._preprocess_answer("0, 1,2") == [0, 1, 2]
+    assert platform._preprocess_answer("A, C") == ["A", "C"]
+    assert platform._preprocess_answer('"B"') == "B"
+    assert platform._preprocess_answer(["", "1,2"]) == [[1, 2]]
+
+    # 格式错误的JSON数组不按逗号拆分，原样返回
+    assert platform._preprocess_answer("[1,2") == "[1,2"
+    assert platform._preprocess_answer("[1,2,]") == "[1,2,]"
+
+
+def test_parse_answer_index():
+    """测试选项索引解析：整数、数字、字母、圈号、"索引|内容"格式"""
+    platform = WenjuanxingPlatform()
+
+    assert platform._parse_answer_index(0) == 0
+    assert platform._parse_answer_index("2") == 2
+    assert platform._parse_answer_index(" 12 ") == 12
+    assert platform._parse_answer_index("B") == 1
+    assert platform._parse_answer_index("c. 选项内容") == 2
+    assert platform._parse_answer_index("③") == 2
+    assert platform._parse_answer_index("③④①") == 2
+    assert platform._parse_answer_index("2|作为分解者") == 2
+    assert platform._parse_answer_index("⑳|内容") == 19
+
+    # 无法解析的答案返回 None，交给文本匹配处理
+    assert platform._parse_answer_index("正确") is None
+    assert platform._parse_answer_index("2a") is None
+    assert platform._parse_answer_index("") is None
+    assert platform._parse_answer_index(None) is None
+    assert platform._parse_answer_index(["A"]) is None
+
+
+def test_find_option_by_text_skips_empty_labels():
+    """测试按文本匹配选项时跳过空文本选项（纯图片、"其他"等）"""
+    platform = WenjuanxingPlatform()
+    labels = ["", "  ", "光合作用", "呼吸作用"]
+
+    def find(answer):
+        return asyncio.run(platform._find_option_by_text(None, "q1", answer, labels))
+
+    assert find("呼吸作用") == 3
+    assert find("B. 呼吸作用") == 3
+    assert find("植物的光合作用") == 2
+    assert find("蒸腾作用") is None
+    assert find("  ") is None
+
+
+if __name__ == "__main__":
+    test_preprocess_answer()
+    test_parse_answer_index()
+    test_find_option_by_text_skips_empty_labels()
+    print("✓ 所有测试通过")